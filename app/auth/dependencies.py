@@ -1,28 +1,43 @@
 from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
 
-from app.database import get_db
 from app.auth.jwt import get_current_user
-from app.models.user import User
+from app.auth.principal import Principal
+from app.auth.permissions import (
+    ensure_permissions_loaded,
+    permission_bit,
+    permission_matrix,
+)
 
 
-def admin_required(
-    current_user: User = Depends(get_current_user),
-):
+def has_permission(principal: Principal, permission: str) -> bool:
+    return permission_matrix.has(principal.role_name, permission_bit(permission))
+
+
+def require_permission(permission: str):
     """
-    Dependency that allows access only to ADMIN users
+    Dependency factory that allows access only to roles granted `permission`
     """
+    bit = permission_bit(permission)  # fail fast on unknown names
+
+    async def dependency(current_user: Principal = Depends(get_current_user)):
+        await ensure_permissions_loaded()
+
+        if not current_user.role_name:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="User role not assigned",
+            )
+
+        if not permission_matrix.has(current_user.role_name, bit):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Permission '{permission}' required",
+            )
+
+        return current_user
 
-    if not current_user.role:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User role not assigned",
-        )
+    return dependency
 
-    if current_user.role.name != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Admin privileges required",
-        )
 
-    return current_user
+# Dependency that allows access only to ADMIN users
+admin_required = require_permission("system:admin")
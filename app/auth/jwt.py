@@ -1,11 +1,15 @@
+import uuid
 from datetime import datetime, timedelta
-from jose import jwt, JWTError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_read_db
 from app.models.user import User
+from app.models.role import Role
+from app.auth.principal import Principal, principal_cache
+from app.auth.revocation import revocation_list
 
 # ========================
 # JWT CONFIG
@@ -21,34 +25,66 @@ security = HTTPBearer()
 # TOKEN CREATION
 # ========================
 def create_access_token(data: dict):
+    # python-jose (and its crypto backends) load on first use
+    from jose import jwt
+
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
 # ========================
-# CURRENT USER
+# TOKEN PAYLOAD
 # ========================
-def get_current_user(
+def get_token_payload(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-):
+) -> dict:
+    from jose import jwt, JWTError
+
     token = credentials.credentials
 
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
 
-        if not user_id:
+        if not payload.get("sub"):
             raise HTTPException(status_code=401, detail="Invalid token")
 
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
-    user = db.query(User).filter(User.id == user_id).first()
+    # In-memory denylist check, no query
+    jti = payload.get("jti")
+    if jti and revocation_list.is_revoked(jti):
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+
+    return payload
+
+
+# ========================
+# CURRENT USER
+# ========================
+async def get_current_user(
+    payload: dict = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_read_db),
+) -> Principal:
+    user_id: str = payload["sub"]
+
+    # Hot path: no database round-trip for a cached principal
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    result = await db.execute(
+        select(User.id, User.email, Role.name)
+        .outerjoin(Role, User.role_id == Role.id)
+        .where(User.id == user_id)
+    )
+    row = result.first()
 
-    if not user:
+    if not row:
         raise HTTPException(status_code=404, detail="User not found")
 
-    return user
+    principal = Principal(id=row[0], email=row[1], role_name=row[2])
+    principal_cache.set(user_id, principal)
+    return principal
@@ -1,6 +1,40 @@
-from passlib.context import CryptContext
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.metrics import metrics
+
+# ========================
+# HASHING CONFIG
+# ========================
+# Hashes made with a different cost are flagged by needs_update() and
+# transparently rehashed on the next successful login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+
+@lru_cache(maxsize=1)
+def get_pwd_context():
+    # passlib/bcrypt are loaded on first use, not at worker start
+    from passlib.context import CryptContext
+
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=BCRYPT_ROUNDS,
+        bcrypt__min_rounds=BCRYPT_ROUNDS,
+        bcrypt__max_rounds=BCRYPT_ROUNDS,
+    )
+
+
+# Dedicated, size-limited pool so a login burst cannot take over the
+# threads other endpoints rely on
+_hash_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
 
 def _truncate_password(password: str) -> str:
     password_bytes = password.encode("utf-8")
@@ -10,8 +44,37 @@ def _truncate_password(password: str) -> str:
 
 def hash_password(password: str) -> str:
     safe_password = _truncate_password(password)
-    return pwd_context.hash(safe_password)
+    return get_pwd_context().hash(safe_password)
 
 def verify_password(password: str, hashed: str) -> bool:
     safe_password = _truncate_password(password)
-    return pwd_context.verify(safe_password, hashed)
+    return get_pwd_context().verify(safe_password, hashed)
+
+def verify_and_update_password(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and return a replacement hash when the stored one
+    was made with outdated settings (None otherwise)
+    """
+    safe_password = _truncate_password(password)
+    return get_pwd_context().verify_and_update(safe_password, hashed)
+
+
+# ========================
+# ASYNC WRAPPERS
+# ========================
+async def _run_in_hash_pool(func, *args):
+    loop = asyncio.get_running_loop()
+    metrics.inc("password_hash_in_flight")
+    try:
+        return await loop.run_in_executor(_hash_executor, func, *args)
+    finally:
+        metrics.inc("password_hash_in_flight", value=-1)
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_hash_pool(hash_password, password)
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    return await _run_in_hash_pool(verify_password, password, hashed)
+
+async def verify_and_update_password_async(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return await _run_in_hash_pool(verify_and_update_password, password, hashed)
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import os
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database import AsyncReadSessionLocal
+from app.models.permission import Permission
+from app.models.role import Role
+from app.models.role_permission import RoleHasPermission
+
+# ========================
+# PERMISSION CATALOG
+# ========================
+PERMISSIONS = (
+    "tasks:read",
+    "tasks:create",
+    "tasks:update",
+    "tasks:delete",
+    "tasks:read_any",
+    "tasks:update_any",
+    "tasks:delete_any",
+    "tasks:export",
+    "users:read",
+    "users:update",
+    "users:delete",
+    "users:export",
+    "system:admin",
+)
+
+# Grants used by the seeder, and while no grant is persisted at all
+DEFAULT_ROLE_PERMISSIONS = {
+    "admin": PERMISSIONS,
+    "user": ("tasks:read", "tasks:create", "tasks:update", "tasks:delete"),
+}
+
+PERMISSION_RELOAD_INTERVAL = float(os.getenv("PERMISSION_RELOAD_INTERVAL", "30"))  # seconds
+
+logger = logging.getLogger(__name__)
+
+PERMISSION_BITS: Dict[str, int] = {name: 1 << index for index, name in enumerate(PERMISSIONS)}
+
+
+def permission_bit(name: str) -> int:
+    try:
+        return PERMISSION_BITS[name]
+    except KeyError:
+        raise ValueError(f"Unknown permission: {name}")
+
+
+def _mask(names: Iterable[str]) -> int:
+    mask = 0
+    for name in names:
+        mask |= PERMISSION_BITS.get(name, 0)
+    return mask
+
+
+def _role_key(role_name: Optional[str]) -> str:
+    # Role names are matched case-insensitively ("ADMIN" == "admin")
+    return (role_name or "").lower()
+
+
+# ========================
+# PERMISSION MATRIX
+# ========================
+class PermissionMatrix:
+    """
+    roles x permissions compiled into one integer bitset per role, so a
+    permission check is a dict lookup plus a bit test
+    """
+
+    def __init__(self):
+        self._masks: Dict[str, int] = {
+            role: _mask(names) for role, names in DEFAULT_ROLE_PERMISSIONS.items()
+        }
+        self.stale = True
+
+    def has(self, role_name: Optional[str], bit: int) -> bool:
+        return bool(self._masks.get(_role_key(role_name), 0) & bit)
+
+    def mark_stale(self) -> None:
+        self.stale = True
+
+    async def reload(self, db: AsyncSession) -> None:
+        self.stale = False
+        result = await db.execute(
+            select(Role.name, Permission.name)
+            .select_from(Role)
+            .outerjoin(RoleHasPermission, RoleHasPermission.role_id == Role.id)
+            .outerjoin(Permission, Permission.id == RoleHasPermission.permission_id)
+        )
+
+        granted: Dict[str, set] = {}
+        for role_name, permission_name in result:
+            names = granted.setdefault(_role_key(role_name), set())
+            if permission_name:
+                names.add(permission_name)
+
+        # Defaults only cover a database with no grants at all (legacy or
+        # unseeded); once any grant exists the table is authoritative, so
+        # a role stripped of every grant really has none
+        if not any(granted.values()):
+            masks = {role: _mask(names) for role, names in DEFAULT_ROLE_PERMISSIONS.items()}
+        else:
+            masks = {role: _mask(names) for role, names in granted.items()}
+
+        self._masks = masks
+
+    def snapshot(self) -> Dict[str, list]:
+        return {
+            role: [name for name, bit in PERMISSION_BITS.items() if mask & bit]
+            for role, mask in self._masks.items()
+        }
+
+
+permission_matrix = PermissionMatrix()
+
+
+async def ensure_permissions_loaded() -> None:
+    if permission_matrix.stale:
+        async with AsyncReadSessionLocal() as db:
+            await permission_matrix.reload(db)
+
+
+async def run_permission_reload(interval: float = PERMISSION_RELOAD_INTERVAL) -> None:
+    """
+    Periodically pick up role assignment changes made by other processes
+    """
+    while True:
+        try:
+            permission_matrix.mark_stale()
+            await ensure_permissions_loaded()
+        except Exception:
+            logger.exception("Permission matrix reload failed")
+        await asyncio.sleep(interval)
+
+
+# ========================
+# CHANGE TRACKING
+# ========================
+_RBAC_MODELS = (Role, Permission, RoleHasPermission)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_rbac_changes(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, _RBAC_MODELS):
+            session.info["rbac_changed"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _reload_after_commit(session):
+    if session.info.pop("rbac_changed", False):
+        permission_matrix.mark_stale()
@@ -0,0 +1,178 @@
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import SQLITE_BUSY_TIMEOUT, AsyncSessionLocal
+from app.models.revoked_token import RevokedToken
+
+# ========================
+# REVOCATION CONFIG
+# ========================
+REVOCATION_BLOOM_CAPACITY = int(os.getenv("REVOCATION_BLOOM_CAPACITY", "100000"))
+REVOCATION_BLOOM_ERROR_RATE = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", "0.001"))
+REVOCATION_SYNC_INTERVAL = float(os.getenv("REVOCATION_SYNC_INTERVAL", "5"))  # seconds
+# revoked_at is stamped at flush, before the INSERT may wait up to
+# busy_timeout for the write lock, so a row can commit after a later-stamped
+# one was synced. Each sync re-reads this far behind its high-water mark.
+REVOCATION_SYNC_OVERLAP = float(
+    os.getenv("REVOCATION_SYNC_OVERLAP", str(SQLITE_BUSY_TIMEOUT / 1000 + 5))
+)  # seconds
+
+logger = logging.getLogger(__name__)
+
+
+# ========================
+# BLOOM FILTER
+# ========================
+class BloomFilter:
+    """
+    Fixed-size Bloom filter using double hashing over one blake2b digest
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+# ========================
+# REVOCATION LIST
+# ========================
+class RevocationList:
+    """
+    In-memory mirror of the revoked_tokens table.
+
+    The Bloom filter answers the common "not revoked" case without a
+    dict probe; positives are confirmed against the exact jti -> exp map.
+    Entries whose token has expired are dropped on purge().
+    """
+
+    def __init__(
+        self,
+        capacity: int = REVOCATION_BLOOM_CAPACITY,
+        error_rate: float = REVOCATION_BLOOM_ERROR_RATE,
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._expiry: Dict[str, float] = {}
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._lock = threading.Lock()
+        self._last_synced = datetime.min
+
+    def is_revoked(self, jti: str) -> bool:
+        if jti not in self._bloom:
+            return False
+        exp = self._expiry.get(jti)
+        return exp is not None and exp > time.time()
+
+    def add(self, jti: str, exp: float) -> None:
+        with self._lock:
+            self._expiry[jti] = exp
+            self._bloom.add(jti)
+
+    def purge(self) -> int:
+        """
+        Drop expired entries and rebuild the filter from what is left
+        """
+        now = time.time()
+        with self._lock:
+            live = {jti: exp for jti, exp in self._expiry.items() if exp > now}
+            removed = len(self._expiry) - len(live)
+            if removed:
+                bloom = BloomFilter(max(self.capacity, len(live)), self.error_rate)
+                for jti in live:
+                    bloom.add(jti)
+                self._expiry = live
+                self._bloom = bloom
+            return removed
+
+    async def sync(self, db: AsyncSession) -> None:
+        """
+        Pull rows revoked since the last sync (e.g. by other workers)
+        """
+        since = self._last_synced
+        if since != datetime.min:
+            # Re-adding a known jti is harmless; missing a late commit is not
+            since -= timedelta(seconds=REVOCATION_SYNC_OVERLAP)
+        result = await db.execute(
+            select(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at)
+            .where(RevokedToken.revoked_at >= since)
+            .where(RevokedToken.expires_at > datetime.utcnow())
+        )
+        for jti, expires_at, revoked_at in result:
+            self.add(jti, _to_timestamp(expires_at))
+            self._last_synced = max(self._last_synced, revoked_at)
+
+    async def revoke(self, db: AsyncSession, jti: str, user_id: str, exp: float) -> None:
+        db.add(
+            RevokedToken(
+                jti=jti,
+                user_id=user_id,
+                expires_at=datetime.utcfromtimestamp(exp),
+            )
+        )
+        await db.commit()
+        self.add(jti, exp)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._expiry),
+            "bloom_bits": self._bloom.size,
+            "bloom_hashes": self._bloom.hash_count,
+        }
+
+
+def _to_timestamp(value: datetime) -> float:
+    return (value - datetime(1970, 1, 1)).total_seconds()
+
+
+revocation_list = RevocationList()
+
+
+# ========================
+# BACKGROUND SYNC
+# ========================
+async def _purge_expired_rows(db: AsyncSession) -> None:
+    await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow()))
+    await db.commit()
+
+
+async def run_revocation_sync(interval: float = REVOCATION_SYNC_INTERVAL) -> None:
+    """
+    Keep this worker's mirror in step with the persisted denylist
+    """
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                await revocation_list.sync(db)
+                revocation_list.purge()
+                # Every tick: rows that expired before any worker loaded
+                # them never reach the in-memory purge (indexed delete)
+                await _purge_expired_rows(db)
+        except Exception:
+            logger.exception("Token revocation sync failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, insert, literal, select
+from sqlalchemy.engine import Connection
+
+from app.core.sharding import shard_async_engines
+from app.models.task import Task
+from app.models.task_archive import TaskArchive
+
+# ========================
+# ARCHIVE CONFIG
+# ========================
+# Tasks whose status is terminal and untouched (updated_at) for longer
+# than ARCHIVE_AFTER_DAYS move from tasks to tasks_archive. Archived tasks
+# leave the search index; the task_stats counters keep counting them.
+ARCHIVE_STATUSES = tuple(
+    status.strip() for status in os.getenv("ARCHIVE_STATUSES", "done,cancelled").split(",") if status.strip()
+)
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+# Pause between batches so request writers get the lock in between
+ARCHIVE_BATCH_PAUSE = float(os.getenv("ARCHIVE_BATCH_PAUSE", "0.05"))  # seconds
+# Background compaction period; 0 leaves it to `python -m app.scripts.archive_tasks`
+ARCHIVE_INTERVAL = float(os.getenv("ARCHIVE_INTERVAL", "0"))  # seconds
+
+logger = logging.getLogger(__name__)
+
+# Columns copied as-is from tasks into tasks_archive
+_COLUMNS = [column.name for column in Task.__table__.columns]
+
+
+def archive_cutoff(after_days: float = ARCHIVE_AFTER_DAYS) -> datetime:
+    return datetime.utcnow() - timedelta(days=after_days)
+
+
+# ========================
+# COMPACTION
+# ========================
+def archive_batch(
+    connection: Connection,
+    cutoff: datetime,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    statuses=ARCHIVE_STATUSES,
+) -> int:
+    """
+    Move up to `batch_size` eligible tasks into tasks_archive with an
+    INSERT ... SELECT and a DELETE in the caller's transaction.
+    Returns the number of tasks moved.
+    """
+    eligible = (Task.status.in_(statuses), Task.updated_at < cutoff)
+    ids = connection.execute(
+        select(Task.id).where(*eligible).order_by(Task.updated_at).limit(batch_size)
+    ).scalars().all()
+    if not ids:
+        return 0
+
+    # Eligibility is re-checked so a task edited since the id lookup stays
+    chosen = (Task.id.in_(ids), *eligible)
+    source = select(*(Task.__table__.c[name] for name in _COLUMNS), literal(datetime.utcnow())).where(*chosen)
+    connection.execute(insert(TaskArchive).from_select(_COLUMNS + ["archived_at"], source))
+    connection.execute(delete(Task).where(*chosen))
+    return len(ids)
+
+
+def archive_tasks(engine, cutoff: Optional[datetime] = None, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """
+    Run batches (one short transaction each) until nothing is eligible
+    """
+    cutoff = cutoff or archive_cutoff()
+    total = 0
+    while True:
+        with engine.begin() as connection:
+            moved = archive_batch(connection, cutoff, batch_size)
+        total += moved
+        if moved < batch_size:
+            return total
+        time.sleep(ARCHIVE_BATCH_PAUSE)
+
+
+async def run_archive_compaction(interval: float = ARCHIVE_INTERVAL) -> None:
+    """
+    Periodic compaction on the async engines (every task shard), one
+    batch per transaction
+    """
+    while True:
+        try:
+            cutoff = archive_cutoff()
+            total = 0
+            for async_engine in shard_async_engines():
+                while True:
+                    async with async_engine.begin() as connection:
+                        moved = await connection.run_sync(archive_batch, cutoff)
+                    total += moved
+                    if moved < ARCHIVE_BATCH_SIZE:
+                        break
+                    await asyncio.sleep(ARCHIVE_BATCH_PAUSE)
+            if total:
+                logger.info("Archived %d tasks", total)
+        except Exception:
+            logger.exception("Task archive compaction failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,75 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+from app.core.serialization import FastJSONResponse
+
+
+# ========================
+# VALIDATORS
+# ========================
+def weak_etag(*parts) -> str:
+    """
+    Build a weak ETag from any stable parts (ids, timestamps, counts)
+    """
+    digest = hashlib.blake2b(digest_size=12)
+    for part in parts:
+        value = part.isoformat() if isinstance(part, datetime) else str(part)
+        digest.update(value.encode("utf-8"))
+        digest.update(b"\x1f")
+    return f'W/"{digest.hexdigest()}"'
+
+
+def http_date(value: datetime) -> str:
+    # Stored timestamps are naive UTC (datetime.utcnow)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Weak comparison against If-None-Match (RFC 9110 13.1.2)
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    wanted = _opaque(etag)
+    return any(_opaque(candidate) == wanted for candidate in header.split(","))
+
+
+def set_validators(response: Response, etag: str, last_modified: Optional[datetime] = None) -> None:
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified)
+
+
+def not_modified(etag: str, last_modified: Optional[datetime] = None) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_validators(response, etag, last_modified)
+    return response
+
+
+def conditional_json(request: Request, content) -> Response:
+    """
+    JSON response validated by a hash of its body, for resources that have
+    no update timestamp to derive an ETag from (e.g. users). Saves the
+    transfer, not the query.
+    """
+    response = FastJSONResponse(content)
+    etag = weak_etag(hashlib.blake2b(response.body, digest_size=12).hexdigest())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    set_validators(response, etag)
+    return response
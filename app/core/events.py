@@ -0,0 +1,150 @@
+import asyncio
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from app.core.metrics import metrics
+from app.core.serialization import dumps
+
+# ========================
+# EVENT HUB CONFIG
+# ========================
+# The hub is in-process: subscribers only see writes handled by the same
+# worker. Event ids carry a per-boot prefix so an id from another process
+# (or before a restart) is recognised and answered with a reset.
+EVENT_LOG_SIZE = int(os.getenv("EVENT_LOG_SIZE", "1000"))
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "100"))  # per subscriber
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+SSE_RETRY_MS = int(os.getenv("SSE_RETRY_MS", "3000"))
+
+_BOOT = format(int(time.time() * 1000), "x")
+
+
+@dataclass(frozen=True)
+class Event:
+    seq: int
+    owner_id: str
+    type: str
+    frame: str  # pre-rendered SSE frame
+
+
+class Subscription:
+    def __init__(self, owner_id: str, maxsize: int):
+        self.owner_id = owner_id
+        # None is pushed when the subscriber fell too far behind
+        self.queue: "asyncio.Queue[Optional[Event]]" = asyncio.Queue(maxsize=maxsize)
+
+
+# ========================
+# PUB/SUB HUB
+# ========================
+class EventHub:
+    """
+    Fan-out of task change events to per-owner subscribers.
+
+    Every subscriber has a bounded queue. A subscriber that cannot keep up
+    is disconnected rather than slowing publishers or buffering without
+    limit; it resumes from the retained log via Last-Event-ID.
+    """
+
+    def __init__(self, log_size: int = EVENT_LOG_SIZE, queue_size: int = EVENT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._log: Deque[Event] = deque(maxlen=log_size)
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._seq = 0
+
+    def publish(self, owner_id: str, event_type: str, data: dict) -> Event:
+        self._seq += 1
+        frame = (
+            f"id: {_BOOT}-{self._seq}\n"
+            f"event: {event_type}\n"
+            f"data: {dumps(data).decode('utf-8')}\n\n"
+        )
+        event = Event(self._seq, owner_id, event_type, frame)
+        self._log.append(event)
+        metrics.inc("sse_events_published_total", (("type", event_type),))
+
+        for subscription in list(self._subscribers.get(owner_id, ())):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._drop(subscription)
+        return event
+
+    def _drop(self, subscription: Subscription) -> None:
+        self.unsubscribe(subscription)
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+        metrics.inc("sse_subscribers_dropped_total")
+
+    def subscribe(self, owner_id: str, last_event_id: Optional[str] = None) -> Tuple[Subscription, List[Event], bool]:
+        """
+        Register a subscriber. Returns (subscription, events to replay,
+        reset) where reset means events may have been missed and the
+        client should re-fetch its list.
+        """
+        subscription = Subscription(owner_id, self.queue_size)
+        self._subscribers.setdefault(owner_id, set()).add(subscription)
+
+        if not last_event_id:
+            return subscription, [], False
+
+        boot, _, seq = last_event_id.partition("-")
+        if boot != _BOOT or not seq.isdigit():
+            return subscription, [], True
+
+        last_seq = int(seq)
+        if self._log and self._log[0].seq > last_seq + 1:
+            return subscription, [], True
+
+        replay = [event for event in self._log if event.seq > last_seq and event.owner_id == owner_id]
+        return subscription, replay, False
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.owner_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.owner_id]
+
+    def subscriber_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+task_events = EventHub()
+
+metrics.add_collector(lambda: [("sse_subscribers", (), task_events.subscriber_count())])
+
+
+# ========================
+# SSE STREAM
+# ========================
+async def sse_stream(request, subscription: Subscription, replay: List[Event], reset: bool):
+    """
+    Body iterator for a text/event-stream response: replayed events
+    first, then live ones, with comment heartbeats while idle
+    """
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        if reset:
+            yield "event: reset\ndata: {}\n\n"
+        for event in replay:
+            yield event.frame
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keep-alive\n\n"
+                continue
+            if event is None:
+                break
+            yield event.frame
+    finally:
+        task_events.unsubscribe(subscription)
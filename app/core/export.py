@@ -0,0 +1,93 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Literal, Optional, Sequence, Type
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import select
+
+from app.database import AsyncReadSessionLocal
+
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_CHUNK_SIZE = 1000
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+# ========================
+# ROW STREAMING
+# ========================
+async def _iter_rows(
+    model,
+    schema: Type[BaseModel],
+    chunk_size: int,
+    session_factories: Sequence = (AsyncReadSessionLocal,),
+) -> AsyncIterator[dict]:
+    """
+    Read rows through a streaming cursor in chunks of `chunk_size`.
+
+    The generator owns its sessions: the request-scoped one from get_db()
+    may already be closed while the response body is still being sent.
+    With several session factories (task shards) the databases are read
+    one after another, each in created_at order.
+    """
+    stmt = (
+        select(model)
+        .order_by(model.created_at, model.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    for session_factory in session_factories:
+        async with session_factory() as db:
+            result = await db.stream_scalars(stmt)
+            async for row in result:
+                yield schema.model_validate(row).model_dump(mode="json")
+
+
+async def _ndjson_lines(rows: AsyncIterator[dict]) -> AsyncIterator[str]:
+    async for row in rows:
+        yield json.dumps(row, separators=(",", ":")) + "\n"
+
+
+async def _csv_lines(rows: AsyncIterator[dict], fields) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+
+    writer.writeheader()
+    yield buffer.getvalue()
+
+    async for row in rows:
+        buffer.seek(0)
+        buffer.truncate(0)
+        writer.writerow(row)
+        yield buffer.getvalue()
+
+
+def stream_export(
+    model,
+    schema: Type[BaseModel],
+    fmt: ExportFormat,
+    filename: str,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    session_factories: Optional[Sequence] = None,
+) -> StreamingResponse:
+    """
+    Build a StreamingResponse that writes `model` rows as NDJSON or CSV
+    line by line, keeping memory flat regardless of table size
+    """
+    rows = _iter_rows(model, schema, chunk_size, session_factories or (AsyncReadSessionLocal,))
+
+    if fmt == "csv":
+        body = _csv_lines(rows, list(schema.model_fields))
+    else:
+        body = _ndjson_lines(rows)
+
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
@@ -0,0 +1,307 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional, Tuple, Type
+
+from fastapi import HTTPException, Request, Response, status
+from pydantic import BaseModel
+from sqlalchemy import and_, delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.auth.jwt import SECRET_KEY
+from app.core.metrics import metrics
+from app.core.serialization import FastJSONResponse
+from app.database import AsyncSessionLocal
+from app.models.idempotency_key import IdempotencyKey
+
+# ========================
+# IDEMPOTENCY CONFIG
+# ========================
+# Only successful (2xx) responses are stored; errors and crashes release
+# the key so a retry runs the request again.
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+# A claim older than this is assumed to belong to a dead worker
+IDEMPOTENCY_LOCK_TIMEOUT = float(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT", "60"))  # seconds
+IDEMPOTENCY_PURGE_INTERVAL = float(os.getenv("IDEMPOTENCY_PURGE_INTERVAL", "3600"))  # seconds
+
+MAX_KEY_LENGTH = 255
+REPLAY_HEADER = "Idempotent-Replayed"
+# Unauthenticated clients share no identity; see idempotent()
+ANONYMOUS_SCOPE = "anonymous"
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str]
+
+
+class StoredResponse(NamedTuple):
+    fingerprint: str
+    status_code: int
+    body: bytes
+    media_type: Optional[str]
+    expires_at: datetime
+
+
+async def request_fingerprint(request: Request) -> str:
+    """
+    Keyed hash of method, path and body. HMAC rather than a bare digest
+    because registration bodies carry a password.
+    """
+    # Starlette caches the body, already read for the endpoint's model
+    body = await request.body()
+    digest = hmac.new(SECRET_KEY.encode("utf-8"), digestmod=hashlib.sha256)
+    digest.update(f"{request.method} {request.url.path}\n".encode("utf-8"))
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def _in_progress() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="A request with this Idempotency-Key is still in progress",
+        headers={"Retry-After": "1"},
+    )
+
+
+# ========================
+# STORE
+# ========================
+class IdempotencyStore:
+    """
+    First response per (scope, Idempotency-Key), persisted in
+    idempotency_keys behind a bounded LRU.
+
+    The first request claims the key with a pending row, so a duplicate on
+    another worker gets 409 instead of running the write again; duplicates
+    on this worker simply wait for the in-flight request's result.
+    """
+
+    def __init__(self, max_entries: int = IDEMPOTENCY_CACHE_SIZE, ttl: float = IDEMPOTENCY_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._cache: "OrderedDict[CacheKey, StoredResponse]" = OrderedDict()
+        self._in_flight: Dict[CacheKey, asyncio.Future] = {}
+
+    # -----------------------------
+    # LRU
+    # -----------------------------
+    def _cached(self, cache_key: CacheKey) -> Optional[StoredResponse]:
+        stored = self._cache.get(cache_key)
+        if stored is None:
+            return None
+        if stored.expires_at <= datetime.utcnow():
+            del self._cache[cache_key]
+            return None
+        self._cache.move_to_end(cache_key)
+        return stored
+
+    def _remember(self, cache_key: CacheKey, stored: StoredResponse) -> None:
+        self._cache[cache_key] = stored
+        self._cache.move_to_end(cache_key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    async def _claim(self, scope: str, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        """
+        Insert a pending row for the key. Returns None once claimed, or the
+        stored response of an earlier request; raises 409 while another
+        worker still runs it.
+        """
+        now = datetime.utcnow()
+        identity = and_(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+
+        async with AsyncSessionLocal() as db:
+            for _ in range(2):
+                # A plain INSERT, portable across backends: the primary key
+                # rejects it when another request holds the key
+                try:
+                    await db.execute(
+                        insert(IdempotencyKey).values(
+                            scope=scope,
+                            key=key,
+                            fingerprint=fingerprint,
+                            created_at=now,
+                            expires_at=now + timedelta(seconds=self.ttl),
+                        )
+                    )
+                    await db.commit()
+                    return None
+                except IntegrityError:
+                    await db.rollback()
+
+                row = (await db.execute(select(IdempotencyKey).where(identity))).scalars().first()
+                if row is None:
+                    continue
+                if row.status_code is not None and row.expires_at > now:
+                    return StoredResponse(row.fingerprint, row.status_code, row.body, row.media_type, row.expires_at)
+                if row.status_code is None and row.created_at > now - timedelta(seconds=IDEMPOTENCY_LOCK_TIMEOUT):
+                    raise _in_progress()
+
+                # Expired response or abandoned claim: take the key over
+                await db.execute(delete(IdempotencyKey).where(identity, IdempotencyKey.created_at == row.created_at))
+                await db.commit()
+                db.expunge_all()
+
+        raise _in_progress()
+
+    async def _complete(self, scope: str, key: str, stored: StoredResponse) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+                .values(status_code=stored.status_code, body=stored.body, media_type=stored.media_type)
+            )
+            await db.commit()
+
+    async def _release(self, scope: str, key: str) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.scope == scope,
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.status_code.is_(None),
+                )
+            )
+            await db.commit()
+
+    async def purge(self) -> int:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.utcnow()))
+            await db.commit()
+            return result.rowcount
+
+    # -----------------------------
+    # Entry point
+    # -----------------------------
+    def _replay(self, stored: StoredResponse, fingerprint: str) -> Response:
+        if not hmac.compare_digest(stored.fingerprint, fingerprint):
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used with a different request",
+            )
+        metrics.inc("idempotent_replays_total")
+        return Response(
+            content=stored.body,
+            status_code=stored.status_code,
+            media_type=stored.media_type,
+            headers={REPLAY_HEADER: "true"},
+        )
+
+    async def run(
+        self,
+        scope: str,
+        key: str,
+        fingerprint: str,
+        operation: Callable[[], Awaitable[Response]],
+    ) -> Response:
+        cache_key = (scope, key)
+
+        stored = self._cached(cache_key)
+        if stored is not None:
+            return self._replay(stored, fingerprint)
+
+        in_flight = self._in_flight.get(cache_key)
+        if in_flight is not None:
+            # Shielded: a waiter disconnecting must not cancel the original
+            return self._replay(await asyncio.shield(in_flight), fingerprint)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[cache_key] = future
+        try:
+            stored = await self._claim(scope, key, fingerprint)
+            if stored is not None:
+                self._remember(cache_key, stored)
+                future.set_result(stored)
+                return self._replay(stored, fingerprint)
+
+            try:
+                response = await operation()
+            except BaseException:
+                await asyncio.shield(self._release(scope, key))
+                raise
+
+            stored = StoredResponse(
+                fingerprint,
+                response.status_code,
+                bytes(response.body),
+                response.media_type,
+                datetime.utcnow() + timedelta(seconds=self.ttl),
+            )
+            if 200 <= response.status_code < 300:
+                await self._complete(scope, key, stored)
+                self._remember(cache_key, stored)
+            else:
+                await self._release(scope, key)
+            future.set_result(stored)
+            return response
+        except BaseException as exc:
+            if not future.done():
+                future.set_exception(exc)
+                future.exception()  # waiters re-raise it; mark it retrieved
+            raise
+        finally:
+            self._in_flight.pop(cache_key, None)
+
+
+idempotency_store = IdempotencyStore()
+
+
+# ========================
+# ROUTE HELPER
+# ========================
+async def idempotent(
+    request: Request,
+    key: Optional[str],
+    scope: str,
+    operation: Callable[[], Awaitable],
+    schema: Optional[Type[BaseModel]] = None,
+    status_code: int = status.HTTP_200_OK,
+):
+    """
+    Run `operation` at most once per (scope, Idempotency-Key). Its result
+    is rendered through `schema` into the response that gets stored and
+    replayed. Without a key the result is returned untouched, as before.
+    """
+    if key is None:
+        return await operation()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters",
+        )
+
+    async def render() -> Response:
+        result = await operation()
+        if isinstance(result, Response):
+            return result
+        content = schema.model_validate(result).model_dump(mode="json") if schema else result
+        return FastJSONResponse(content, status_code=status_code)
+
+    fingerprint = await request_fingerprint(request)
+    if scope == ANONYMOUS_SCOPE:
+        # Keys from unrelated clients must not collide: only an identical
+        # request with the same key replays, anything else runs on its own
+        scope = f"{ANONYMOUS_SCOPE}:{fingerprint}"
+    return await idempotency_store.run(scope, key, fingerprint, render)
+
+
+async def run_idempotency_purge(interval: float = IDEMPOTENCY_PURGE_INTERVAL) -> None:
+    """
+    Periodically drop stored responses past their TTL
+    """
+    while True:
+        try:
+            purged = await idempotency_store.purge()
+            if purged:
+                logger.info("Purged %d expired idempotency keys", purged)
+        except Exception:
+            logger.exception("Idempotency key purge failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,271 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# ========================
+# CONFIG
+# ========================
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+# ========================
+# SHARDED REGISTRY
+# ========================
+class _Shard:
+    def __init__(self):
+        self.counters: Dict[Tuple[str, Labels], float] = defaultdict(float)
+        self.histograms: Dict[Tuple[str, Labels], list] = {}
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms aggregated per thread and merged on scrape.
+
+    Each thread only ever writes to its own shard, so the hot path takes
+    no lock; the registry lock is held only when a new thread first
+    records something and while /metrics merges the shards.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._buckets: Dict[str, tuple] = {}
+        self._collectors: List[Callable[[], List[Tuple[str, Labels, float]]]] = []
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard()
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def describe(self, name: str, kind: str, help_text: str, buckets: tuple = ()) -> None:
+        self._help[name] = (kind, help_text)
+        if buckets:
+            self._buckets[name] = buckets
+
+    def inc(self, name: str, labels: Labels = (), value: float = 1.0) -> None:
+        self._shard().counters[(name, labels)] += value
+
+    def observe(self, name: str, labels: Labels, value: float) -> None:
+        buckets = self._buckets[name]
+        histograms = self._shard().histograms
+        entry = histograms.get((name, labels))
+        if entry is None:
+            entry = histograms[(name, labels)] = [[0] * (len(buckets) + 1), 0.0, 0]
+        entry[0][bisect_left(buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def add_collector(self, collector: Callable[[], List[Tuple[str, Labels, float]]]) -> None:
+        """
+        Register a callback producing gauge samples at scrape time
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        counters: Dict[Tuple[str, Labels], float] = defaultdict(float)
+        histograms: Dict[Tuple[str, Labels], list] = {}
+
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for key, value in list(shard.counters.items()):
+                counters[key] += value
+            for key, (buckets, total, count) in list(shard.histograms.items()):
+                merged = histograms.setdefault(key, [[0] * len(buckets), 0.0, 0])
+                merged[0] = [a + b for a, b in zip(merged[0], buckets)]
+                merged[1] += total
+                merged[2] += count
+
+        for collector in self._collectors:
+            for name, labels, value in collector():
+                counters[(name, labels)] = value
+
+        lines: List[str] = []
+        emitted = set()
+
+        def header(name):
+            if name not in emitted and name in self._help:
+                kind, help_text = self._help[name]
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+            emitted.add(name)
+
+        for (name, labels), value in sorted(counters.items()):
+            header(name)
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        for (name, labels), (buckets, total, count) in sorted(histograms.items()):
+            header(name)
+            cumulative = 0
+            bounds = [str(b) for b in self._buckets[name]] + ["+Inf"]
+            for bound, bucket_count in zip(bounds, buckets):
+                cumulative += bucket_count
+                lines.append(
+                    f"{name}_bucket{_format_labels(labels + (('le', bound),))} {cumulative}"
+                )
+            lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+metrics = MetricsRegistry()
+
+metrics.describe(
+    "http_request_duration_seconds", "histogram",
+    "Request latency by method, route and status", LATENCY_BUCKETS,
+)
+metrics.describe("http_requests_in_flight", "gauge", "Requests currently being handled")
+metrics.describe("app_errors_total", "counter", "Errors returned by the global exception handlers")
+metrics.describe(
+    "db_pool_checkout_wait_seconds", "histogram",
+    "Time spent waiting for a pooled connection", POOL_WAIT_BUCKETS,
+)
+metrics.describe("db_pool_connections", "gauge", "Pool connections by state")
+metrics.describe("threadpool_tokens", "gauge", "Starlette/anyio worker thread limiter usage")
+metrics.describe("password_hash_in_flight", "gauge", "Password hash operations queued or running")
+metrics.describe("rate_limited_total", "counter", "Requests rejected by the auth rate limiter")
+metrics.describe("sse_events_published_total", "counter", "Task change events published to the SSE hub")
+metrics.describe("sse_subscribers_dropped_total", "counter", "SSE subscribers disconnected for falling behind")
+metrics.describe("sse_subscribers", "gauge", "Open SSE task streams")
+metrics.describe("idempotent_replays_total", "counter", "Responses replayed for a repeated Idempotency-Key")
+metrics.describe(
+    "write_batch_size", "histogram",
+    "Writes applied per group-commit transaction", BATCH_SIZE_BUCKETS,
+)
+
+
+def record_error(handler: str, status_code: int) -> None:
+    metrics.inc("app_errors_total", (("handler", handler), ("status", str(status_code))))
+
+
+# ========================
+# REQUEST MIDDLEWARE
+# ========================
+class MetricsMiddleware:
+    """
+    Records per-route / per-status latency and in-flight requests
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+        metrics.inc("http_requests_in_flight")
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.inc("http_requests_in_flight", value=-1)
+            # Route template, not the raw path, keeps label cardinality bounded
+            route = scope.get("route")
+            labels = (
+                ("method", scope["method"]),
+                ("route", getattr(route, "path", "<unmatched>")),
+                ("status", str(status_code)),
+            )
+            metrics.observe("http_request_duration_seconds", labels, time.perf_counter() - started)
+
+
+# ========================
+# POOL INSTRUMENTATION
+# ========================
+class _TimedCheckoutMixin:
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.observe(
+                "db_pool_checkout_wait_seconds",
+                (("pool", self.logging_name or "default"),),
+                time.perf_counter() - started,
+            )
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def register_engine(name: str, sync_engine) -> None:
+    """
+    Report pool size / checked-out / overflow gauges for an engine
+    """
+
+    def collect():
+        pool = sync_engine.pool
+        samples = []
+        for state in ("size", "checkedin", "checkedout", "overflow"):
+            reader = getattr(pool, state, None)
+            if reader is not None:
+                value = reader()
+                if state == "overflow":
+                    # QueuePool counts down from -pool_size until the pool is full
+                    value = max(0, value)
+                samples.append(
+                    ("db_pool_connections", (("pool", name), ("state", state)), value)
+                )
+        return samples
+
+    metrics.add_collector(collect)
+
+
+def _collect_threadpool():
+    try:
+        from anyio.to_thread import current_default_thread_limiter
+
+        limiter = current_default_thread_limiter()
+    except Exception:  # no running event loop
+        return []
+    return [
+        ("threadpool_tokens", (("state", "total"),), limiter.total_tokens),
+        ("threadpool_tokens", (("state", "borrowed"),), limiter.borrowed_tokens),
+        ("threadpool_tokens", (("state", "waiting"),), limiter.statistics().tasks_waiting),
+    ]
+
+
+metrics.add_collector(_collect_threadpool)
@@ -0,0 +1,194 @@
+import logging
+import os
+from datetime import datetime
+from typing import Callable, List, NamedTuple, Optional
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, insert, inspect, select
+from sqlalchemy.engine import Connection, Engine
+
+from app.database import Base
+
+logger = logging.getLogger(__name__)
+
+# ========================
+# MIGRATION CONFIG
+# ========================
+# With AUTO_MIGRATE off, a worker refuses to start against an outdated
+# schema instead of upgrading it; run `python -m app.scripts.migrate`
+# once per deploy in that case.
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "true").lower() in ("1", "true", "yes")
+
+VERSION_TABLE = "schema_version"
+
+# Kept out of Base.metadata so the baseline create_all never touches it
+schema_version = Table(
+    VERSION_TABLE,
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    apply: Callable[[Connection], None]
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, name: str):
+    """
+    Register a schema step. Steps must be idempotent (IF NOT EXISTS,
+    checkfirst=True) so two workers racing through an upgrade are harmless.
+    """
+
+    def decorator(func):
+        if MIGRATIONS and version <= MIGRATIONS[-1].version:
+            raise ValueError(f"Migration {version} registered out of order")
+        MIGRATIONS.append(Migration(version, name, func))
+        return func
+
+    return decorator
+
+
+# ========================
+# MIGRATIONS
+# ========================
+@migration(1, "baseline schema")
+def _baseline(connection: Connection) -> None:
+    import app.models  # noqa: F401  (register tables)
+
+    Base.metadata.create_all(bind=connection)
+
+
+@migration(2, "model indexes on existing tables")
+def _model_indexes(connection: Connection) -> None:
+    # create_all only builds indexes together with a new table
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+@migration(3, "task search index")
+def _search_index(connection: Connection) -> None:
+    from app.core.search import install_search_index
+
+    install_search_index(connection)
+
+
+@migration(4, "task statistics counters")
+def _task_stats(connection: Connection) -> None:
+    from app.core.task_stats import install_task_stats
+
+    install_task_stats(connection)
+
+
+@migration(5, "task archive table")
+def _task_archive(connection: Connection) -> None:
+    from app.models.task_archive import TaskArchive
+
+    TaskArchive.__table__.create(connection, checkfirst=True)
+
+
+@migration(6, "task shard placements")
+def _task_shard_placements(connection: Connection) -> None:
+    from app.models.task_shard_placement import TaskShardPlacement
+
+    TaskShardPlacement.__table__.create(connection, checkfirst=True)
+
+
+@migration(7, "idempotency keys")
+def _idempotency_keys(connection: Connection) -> None:
+    from app.models.idempotency_key import IdempotencyKey
+
+    IdempotencyKey.__table__.create(connection, checkfirst=True)
+
+
+@migration(8, "archived tasks in statistics counters")
+def _task_archive_stats(connection: Connection) -> None:
+    # Counters lost every task archived so far; the new triggers rebuild them
+    from app.core.task_stats import install_task_stats
+
+    install_task_stats(connection)
+
+
+@migration(9, "shard move fence")
+def _shard_move_fence(connection: Connection) -> None:
+    columns = {column["name"] for column in inspect(connection).get_columns("task_shard_placements")}
+    if "moving" not in columns:
+        connection.exec_driver_sql(
+            "ALTER TABLE task_shard_placements ADD COLUMN moving BOOLEAN NOT NULL DEFAULT 0"
+        )
+
+
+# ========================
+# RUNNER
+# ========================
+def head_version() -> int:
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+def current_version(connection: Connection) -> int:
+    if not inspect(connection).has_table(VERSION_TABLE):
+        return 0
+    return connection.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+
+def upgrade(engine: Engine, target: Optional[int] = None) -> List[Migration]:
+    """
+    Apply pending migrations up to `target` (default: latest), each in
+    its own transaction together with its version row. Returns the
+    migrations applied.
+    """
+    target = head_version() if target is None else target
+    applied = []
+
+    with engine.begin() as connection:
+        schema_version.create(connection, checkfirst=True)
+        version = current_version(connection)
+
+    for step in MIGRATIONS:
+        if step.version <= version or step.version > target:
+            continue
+        with engine.begin() as connection:
+            step.apply(connection)
+            connection.execute(
+                insert(schema_version).prefix_with("OR IGNORE", dialect="sqlite"),
+                {"version": step.version, "name": step.name, "applied_at": datetime.utcnow()},
+            )
+        logger.info("Applied migration %s: %s", step.version, step.name)
+        applied.append(step)
+
+    return applied
+
+
+def upgrade_all(target: Optional[int] = None) -> dict:
+    """
+    upgrade() the primary database and every task shard.
+    Returns {database name: migrations applied}.
+    """
+    from app.core.sharding import migration_targets
+
+    return {name: upgrade(target_engine, target) for name, target_engine in migration_targets()}
+
+
+def ensure_schema(engine: Engine) -> None:
+    """
+    Startup check: a single version lookup when the schema is current
+    """
+    with engine.connect() as connection:
+        version = current_version(connection)
+
+    if version >= head_version():
+        return
+
+    if not AUTO_MIGRATE:
+        raise RuntimeError(
+            f"Database schema is at version {version}, expected {head_version()}. "
+            "Run `python -m app.scripts.migrate`."
+        )
+
+    upgrade(engine)
@@ -0,0 +1,114 @@
+import base64
+import heapq
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+# ========================
+# CURSOR ENCODING
+# ========================
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    """
+    Encode a (created_at, id) keyset position as an opaque url-safe token
+    """
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), str(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+# ========================
+# KEYSET PAGINATION
+# ========================
+async def keyset_paginate(
+    db: AsyncSession,
+    stmt: Select,
+    model,
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = True,
+    scalars: bool = True,
+):
+    """
+    Apply (created_at, id) keyset pagination to a select statement.
+
+    Fetches one extra row to know whether another page exists, so every
+    page is a single index range scan regardless of depth. Pass
+    scalars=False for column selects to get Row tuples back.
+    Returns (rows, next_cursor).
+    """
+    created_col = model.created_at
+    id_col = model.id
+
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        if descending:
+            stmt = stmt.where(
+                or_(
+                    created_col < created_at,
+                    and_(created_col == created_at, id_col < row_id),
+                )
+            )
+        else:
+            stmt = stmt.where(
+                or_(
+                    created_col > created_at,
+                    and_(created_col == created_at, id_col > row_id),
+                )
+            )
+
+    if descending:
+        stmt = stmt.order_by(created_col.desc(), id_col.desc())
+    else:
+        stmt = stmt.order_by(created_col.asc(), id_col.asc())
+
+    result = await db.execute(stmt.limit(limit + 1))
+    rows = result.scalars().all() if scalars else result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return rows, next_cursor
+
+
+def merge_pages(pages: List[tuple], limit: int, descending: bool = True):
+    """
+    Merge keyset pages fetched with the same cursor from several shards
+    into one page of at most `limit` rows, in (created_at, id) order.
+
+    Each shard page already holds that shard's first `limit` rows past the
+    cursor, so the global first `limit` rows are among them.
+    Returns (rows, next_cursor) like keyset_paginate.
+    """
+    if len(pages) == 1:
+        return pages[0]
+
+    merged = list(
+        heapq.merge(*(rows for rows, _ in pages), key=lambda row: (row.created_at, row.id), reverse=descending)
+    )
+    more = len(merged) > limit or any(next_cursor for _, next_cursor in pages)
+    rows = merged[:limit]
+
+    next_cursor = None
+    if more and rows:
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return rows, next_cursor
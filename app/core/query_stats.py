@@ -0,0 +1,181 @@
+import heapq
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+
+# ========================
+# CONFIG
+# ========================
+# Statements slower than this are logged at the end of the request (0 = off)
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "0"))
+SLOWEST_QUERIES_KEPT = int(os.getenv("SLOWEST_QUERIES_KEPT", "5"))
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """
+    Query count, total DB time and the slowest statements for one scope
+    """
+
+    def __init__(self, keep: int = SLOWEST_QUERIES_KEPT):
+        self.count = 0
+        self.total_time = 0.0
+        self.keep = keep
+        self.slowest: List[Tuple[float, str]] = []
+        self.statements: Optional[List[str]] = None
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.total_time += duration
+        if self.statements is not None:
+            self.statements.append(statement)
+        if self.keep > 0:
+            if len(self.slowest) < self.keep:
+                heapq.heappush(self.slowest, (duration, statement))
+            elif duration > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, (duration, statement))
+
+    @property
+    def total_ms(self) -> float:
+        return self.total_time * 1000
+
+    def slowest_statements(self) -> List[Tuple[float, str]]:
+        return sorted(self.slowest, reverse=True)
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+# Process-wide collectors used by count_queries() in tests
+_global_collectors: List[QueryStats] = []
+_global_lock = threading.Lock()
+
+
+# ========================
+# ENGINE HOOKS
+# ========================
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start_time")
+    if not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+
+    if _global_collectors:
+        with _global_lock:
+            for collector in _global_collectors:
+                collector.record(statement, duration)
+
+
+def instrument_engine(sync_engine) -> None:
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ========================
+# REQUEST MIDDLEWARE
+# ========================
+class QueryStatsMiddleware:
+    """
+    Attribute queries to the current request and report them as
+    `Server-Timing: db;dur=<ms>;desc="<n> queries", app;dur=<ms>`
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                app_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f'db;dur={stats.total_ms:.2f};desc="{stats.count} queries", '
+                    f"app;dur={app_ms:.2f}"
+                )
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timing.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
+            _log_slow_queries(scope, stats)
+
+
+def _log_slow_queries(scope, stats: QueryStats) -> None:
+    if SLOW_QUERY_THRESHOLD_MS <= 0:
+        return
+    for duration, statement in stats.slowest_statements():
+        if duration * 1000 < SLOW_QUERY_THRESHOLD_MS:
+            break
+        logger.warning(
+            "Slow query (%.1f ms) in %s %s: %s",
+            duration * 1000,
+            scope.get("method"),
+            scope.get("path"),
+            statement,
+        )
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+# ========================
+# TEST HELPERS
+# ========================
+@contextmanager
+def count_queries():
+    """
+    Collect every statement executed on instrumented engines, from any
+    thread, while the block runs
+    """
+    stats = QueryStats()
+    stats.statements = []
+    with _global_lock:
+        _global_collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        with _global_lock:
+            _global_collectors.remove(stats)
+
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """
+    Fail if the block issues more than `limit` queries, e.g.
+
+        with assert_max_queries(2):
+            client.get(f"/tasks/{task_id}", headers=auth)
+    """
+    with count_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        listing = "\n".join(f"  {i + 1}. {sql}" for i, sql in enumerate(stats.statements))
+        raise AssertionError(
+            f"Expected at most {limit} queries, got {stats.count}:\n{listing}"
+        )
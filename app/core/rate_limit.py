@@ -0,0 +1,171 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from app.core.metrics import metrics
+
+# ========================
+# RATE LIMIT CONFIG
+# ========================
+# Limits are "<requests>/<seconds>" token buckets; an empty value or "0"
+# disables that key. Buckets live in this worker's memory only.
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+RATE_LIMIT_MAX_BUCKETS = int(os.getenv("RATE_LIMIT_MAX_BUCKETS", "100000"))  # per key type
+RATE_LIMIT_SHARDS = int(os.getenv("RATE_LIMIT_SHARDS", "16"))
+# Only enable behind a proxy that overwrites X-Forwarded-For
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() in ("1", "true", "yes")
+
+ROUTE_LIMITS = {
+    "login": {
+        "ip": os.getenv("RATE_LIMIT_LOGIN_IP", "20/60"),
+        "email": os.getenv("RATE_LIMIT_LOGIN_EMAIL", "5/60"),
+    },
+    "register": {
+        "ip": os.getenv("RATE_LIMIT_REGISTER_IP", "5/60"),
+        "email": os.getenv("RATE_LIMIT_REGISTER_EMAIL", "3/300"),
+    },
+}
+# Keys that only spend a token through record_failure(). An empty bucket
+# still rejects, but a correct password never drains it, so nobody can
+# lock a victim out of login by posting wrong passwords for their email.
+FAILURE_ONLY_KEYS = {
+    "login": ("email",),
+}
+
+
+def parse_rate(spec: str) -> Optional[Tuple[int, float]]:
+    """
+    "20/60" -> (capacity 20, period 60s); None when disabled
+    """
+    if not spec or spec.strip() == "0":
+        return None
+    capacity, _, period = spec.partition("/")
+    return int(capacity), float(period or 1)
+
+
+# ========================
+# TOKEN BUCKETS
+# ========================
+class TokenBucketLimiter:
+    """
+    Token buckets keyed by an arbitrary string, split over lock-striped
+    shards. Each shard is an LRU capped at max_buckets / shards: evicting
+    the least recently used (idle, hence mostly refilled) bucket keeps
+    memory bounded and at worst hands a quiet key a full bucket again.
+    """
+
+    def __init__(self, capacity: int, period: float, max_buckets: int = RATE_LIMIT_MAX_BUCKETS, shards: int = RATE_LIMIT_SHARDS):
+        self.capacity = capacity
+        self.refill_rate = capacity / period  # tokens per second
+        self._shards = [(threading.Lock(), OrderedDict()) for _ in range(max(1, shards))]
+        self._shard_size = max(1, max_buckets // len(self._shards))
+
+    def acquire(self, key: str, consume: bool = True) -> float:
+        """
+        Take one token for `key`. Returns 0 when allowed, otherwise the
+        seconds until a token is available. With consume=False the bucket
+        is only checked.
+        """
+        lock, buckets = self._shards[hash(key) % len(self._shards)]
+        now = time.monotonic()
+        with lock:
+            tokens, updated = buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * self.refill_rate)
+
+            if tokens >= 1:
+                buckets[key] = (tokens - 1 if consume else tokens, now)
+                retry_after = 0.0
+            else:
+                buckets[key] = (tokens, now)
+                retry_after = (1 - tokens) / self.refill_rate
+
+            buckets.move_to_end(key)
+            if len(buckets) > self._shard_size:
+                buckets.popitem(last=False)
+        return retry_after
+
+    def size(self) -> int:
+        return sum(len(buckets) for _, buckets in self._shards)
+
+
+def _limiter(spec: str) -> Optional[TokenBucketLimiter]:
+    rate = parse_rate(spec)
+    return TokenBucketLimiter(*rate) if rate else None
+
+
+_limiters = {
+    route: {kind: _limiter(spec) for kind, spec in limits.items()}
+    for route, limits in ROUTE_LIMITS.items()
+}
+
+
+# ========================
+# DEPENDENCY
+# ========================
+def client_ip(request: Request) -> str:
+    if RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _normalize_email(email) -> Optional[str]:
+    return email.strip().lower() if isinstance(email, str) else None
+
+
+async def _request_email(request: Request) -> Optional[str]:
+    # Starlette caches the body, so the endpoint can still parse it
+    try:
+        body = await request.json()
+    except ValueError:
+        return None
+    return _normalize_email(body.get("email") if isinstance(body, dict) else None)
+
+
+def rate_limit(route: str):
+    """
+    Route dependency enforcing ROUTE_LIMITS[route] per client IP and per
+    submitted email. Declared in the route's `dependencies`, it runs
+    before the handler, so a rejected request costs no query or hash.
+    """
+    limiters = _limiters[route]
+    failure_only = FAILURE_ONLY_KEYS.get(route, ())
+
+    async def dependency(request: Request) -> None:
+        if not RATE_LIMIT_ENABLED:
+            return
+
+        keys = (("ip", client_ip(request)), ("email", await _request_email(request)))
+        for kind, key in keys:
+            limiter = limiters.get(kind)
+            if limiter is None or key is None:
+                continue
+            retry_after = limiter.acquire(key, consume=kind not in failure_only)
+            if retry_after:
+                metrics.inc("rate_limited_total", (("route", route), ("key", kind)))
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many requests",
+                    headers={"Retry-After": str(math.ceil(retry_after))},
+                )
+
+    return dependency
+
+
+def record_failure(route: str, email: Optional[str]) -> None:
+    """
+    Spend a token from `route`'s failure-only buckets, e.g. after a wrong
+    password for `email`
+    """
+    if not RATE_LIMIT_ENABLED:
+        return
+    email = _normalize_email(email)
+    limiter = _limiters[route].get("email")
+    if email and limiter is not None and "email" in FAILURE_ONLY_KEYS.get(route, ()):
+        limiter.acquire(email)
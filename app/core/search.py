@@ -0,0 +1,96 @@
+import re
+
+from sqlalchemy import column, inspect, literal_column, table, text
+from sqlalchemy.engine import Connection
+
+# ========================
+# FTS5 INDEX
+# ========================
+# External-content FTS5 table over tasks(title, description), keyed by the
+# tasks rowid. VACUUM may renumber rowids of tables without an INTEGER
+# PRIMARY KEY, so run `python -m app.scripts.rebuild_search_index` after it.
+FTS_TABLE = "tasks_fts"
+
+tasks_fts = table(FTS_TABLE, column("rowid"), column("title"), column("description"))
+
+# Title matches weigh more than description matches in bm25()
+BM25_WEIGHTS = (10.0, 1.0)
+
+_DDL = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description,
+        content='tasks', content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON tasks BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.rowid, new.title, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON tasks BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.rowid, old.title, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, description ON tasks BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.rowid, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.rowid, new.title, new.description);
+    END
+    """,
+)
+
+
+def install_search_index(connection: Connection) -> bool:
+    """
+    Create the FTS table and sync triggers if missing; a freshly created
+    index is populated from the existing rows. Returns True if created.
+    """
+    if connection.dialect.name != "sqlite":
+        return False
+
+    created = not inspect(connection).has_table(FTS_TABLE)
+    for statement in _DDL:
+        connection.exec_driver_sql(statement)
+    if created:
+        rebuild_search_index(connection)
+    return created
+
+
+def rebuild_search_index(connection: Connection) -> None:
+    connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+# ========================
+# QUERY BUILDING
+# ========================
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def to_match_query(q: str) -> str:
+    """
+    Turn free text into a safe FTS5 expression: every word is quoted
+    (so operators/punctuation cannot break the syntax), terms are ANDed,
+    and the last one is a prefix match for search-as-you-type.
+    """
+    terms = _TERM.findall(q)
+    if not terms:
+        return ""
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def match_clause():
+    return text(f"{FTS_TABLE} MATCH :match_query")
+
+
+def bm25_rank():
+    weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+    return literal_column(f"bm25({FTS_TABLE}, {weights})")
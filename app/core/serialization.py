@@ -0,0 +1,144 @@
+import json
+from datetime import datetime, timedelta
+from functools import lru_cache
+from operator import itemgetter
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ConfigDict, create_model
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+# ========================
+# JSON ENCODING
+# ========================
+# Output must match what FastAPI produces through Pydantic + JSONResponse:
+# compact separators, raw UTF-8, ISO datetimes with "Z" for UTC.
+def _default(value):
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, datetime):
+        if value.tzinfo is not None and value.utcoffset() == timedelta(0):
+            return value.replace(tzinfo=None).isoformat() + "Z"
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+    return json.dumps(
+        content,
+        default=_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson when available. Accepts plain
+    dicts/lists (with datetimes) and Pydantic models.
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+# ========================
+# ROW PROJECTION
+# ========================
+# Bound for the encoder and sparse schema caches: ?fields= lets clients
+# pick any subset of a schema's fields, so neither may grow without limit.
+ENCODER_CACHE_SIZE = 256
+
+
+def schema_columns(model, schema: Type[BaseModel]) -> List:
+    """
+    Model columns backing `schema`'s fields, in schema field order
+    """
+    table_columns = model.__table__.columns
+    return [getattr(model, name) for name in schema.model_fields if name in table_columns]
+
+
+def projection_columns(model, schema: Type[BaseModel], required: Iterable[str] = ()) -> List:
+    """
+    schema_columns() plus any `required` columns the handler needs but the
+    schema leaves out (e.g. cursor keys). Extras come last, so
+    row_encoder(model, schema) ignores them.
+    """
+    columns = schema_columns(model, schema)
+    selected = {column.key for column in columns}
+    return columns + [getattr(model, name) for name in required if name not in selected]
+
+
+def row_encoder(model, schema: Type[BaseModel]) -> Callable[[Sequence], dict]:
+    """
+    Function turning a Row selected with schema_columns() into the dict
+    Pydantic would have produced. Fields with no backing column take their
+    schema default.
+    """
+    # Keyed by field names, not by the (possibly short-lived) schema class
+    root = getattr(schema, "__sparse_root__", schema)
+    return _row_encoder(model, root, tuple(schema.model_fields))
+
+
+@lru_cache(maxsize=ENCODER_CACHE_SIZE)
+def _row_encoder(model, root: Type[BaseModel], fields: Tuple[str, ...]) -> Callable[[Sequence], dict]:
+    table_columns = model.__table__.columns
+    accessors: List[Tuple[str, Callable]] = []
+    index = 0
+    for name in fields:
+        if name in table_columns:
+            accessors.append((name, itemgetter(index)))
+            index += 1
+        else:
+            default = root.model_fields[name].get_default(call_default_factory=True)
+            accessors.append((name, lambda row, default=default: default))
+
+    def encode(row) -> dict:
+        return {name: get(row) for name, get in accessors}
+
+    return encode
+
+
+# ========================
+# SPARSE FIELDSETS
+# ========================
+@lru_cache(maxsize=ENCODER_CACHE_SIZE)
+def _projected_schema(schema: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    projected = create_model(
+        f"{schema.__name__}[{','.join(fields)}]",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in fields},
+    )
+    # row_encoder() keys on the full schema, so evicting this class frees it
+    projected.__sparse_root__ = schema
+    return projected
+
+
+def sparse_schema(schema: Type[BaseModel], fields: Optional[str]) -> Type[BaseModel]:
+    """
+    Resolve a `?fields=a,b` parameter to a (cached) schema holding only
+    those fields, in `schema`'s field order. No parameter means `schema`.
+    """
+    if not fields:
+        return schema
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - schema.model_fields.keys()
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown field(s): {', '.join(sorted(unknown))}" if unknown else "No fields requested",
+        )
+    if requested == schema.model_fields.keys():
+        return schema
+    return _projected_schema(schema, tuple(name for name in schema.model_fields if name in requested))
@@ -0,0 +1,307 @@
+import asyncio
+import hashlib
+import logging
+import math
+import os
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Dict, List, Optional, Set, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database import (
+    AsyncReadSessionLocal,
+    AsyncSessionLocal,
+    create_shard_engines,
+    engine,
+)
+from app.models.task import Task
+from app.models.task_archive import TaskArchive
+from app.models.task_shard_placement import TaskShardPlacement
+
+# ========================
+# SHARD CONFIG
+# ========================
+# "name=url,name=url,...". Tasks (hot, archived, search index, counters)
+# are spread over these databases by owner; users, roles and tokens stay
+# in DATABASE_URL. Empty keeps tasks in DATABASE_URL as well. Names, not
+# list positions, feed the hash, so reordering the list moves nobody.
+TASK_SHARDS = os.getenv("TASK_SHARDS", "")
+SHARD_PLACEMENT_RELOAD_INTERVAL = float(os.getenv("SHARD_PLACEMENT_RELOAD_INTERVAL", "30"))  # seconds
+
+PRIMARY_SHARD = "primary"
+
+logger = logging.getLogger(__name__)
+
+
+def parse_shards(spec: str) -> List[tuple]:
+    """
+    "a=sqlite:///./a.db,b=sqlite:///./b.db" -> [("a", url), ("b", url)]
+    """
+    shards = []
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, sep, url = entry.partition("=")
+        if not sep or not name.strip() or not url.strip():
+            raise ValueError(f"Invalid TASK_SHARDS entry: {entry!r} (expected name=url)")
+        shards.append((name.strip(), url.strip()))
+    if len({name for name, _ in shards}) != len(shards):
+        raise ValueError("TASK_SHARDS names must be unique")
+    if any(name == PRIMARY_SHARD for name, _ in shards):
+        raise ValueError(f"TASK_SHARDS name {PRIMARY_SHARD!r} is reserved for DATABASE_URL")
+    return shards
+
+
+class Shard:
+    def __init__(
+        self,
+        name: str,
+        sync_engine,
+        session_factory: async_sessionmaker,
+        read_session_factory: async_sessionmaker,
+    ):
+        self.name = name
+        self.engine = sync_engine
+        self.session_factory = session_factory
+        self.read_session_factory = read_session_factory
+
+    @property
+    def async_engine(self):
+        return self.session_factory.kw["bind"]
+
+    def session(self) -> AsyncSession:
+        return self.session_factory()
+
+    def read_session(self) -> AsyncSession:
+        return self.read_session_factory()
+
+
+def _weight(shard_name: str, owner_id: str) -> int:
+    digest = hashlib.blake2b(f"{shard_name}:{owner_id}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+# ========================
+# SHARD ROUTER
+# ========================
+class ShardRouter:
+    """
+    Maps an owner to the shard holding their tasks.
+
+    Placement is rendezvous (highest random weight) hashing over shard
+    names: stable across processes, and adding a shard only moves the
+    owners that now hash to it. Explicit pins from task_shard_placements
+    (written by `python -m app.scripts.rebalance_shards`) take precedence.
+    Owners whose placement is flagged `moving` are read-only until the
+    tool has finished copying their tasks.
+    """
+
+    def __init__(self, shards: List[Shard], sharded: bool):
+        self.shards = shards
+        self.sharded = sharded
+        self._by_name: Dict[str, Shard] = {shard.name: shard for shard in shards}
+        self._placements: Dict[str, str] = {}
+        self._moving: Set[str] = set()
+
+    def get(self, name: str) -> Shard:
+        try:
+            return self._by_name[name]
+        except KeyError:
+            raise ValueError(f"Unknown shard: {name}")
+
+    def home_shard(self, owner_id: str) -> Shard:
+        """
+        Hash placement, ignoring pins
+        """
+        if len(self.shards) == 1:
+            return self.shards[0]
+        return max(self.shards, key=lambda shard: _weight(shard.name, owner_id))
+
+    def shard_for(self, owner_id: str) -> Shard:
+        pinned = self._placements.get(owner_id)
+        if pinned is not None and pinned in self._by_name:
+            return self._by_name[pinned]
+        return self.home_shard(owner_id)
+
+    def set_placements(self, placements: Dict[str, str], moving: Set[str] = frozenset()) -> None:
+        self._placements = placements
+        self._moving = set(moving)
+
+    def _apply_placements(self, rows) -> None:
+        placements, moving = {}, set()
+        for owner_id, shard, is_moving in rows:
+            placements[owner_id] = shard
+            if is_moving:
+                moving.add(owner_id)
+        self.set_placements(placements, moving)
+
+    async def reload_placements(self, db: AsyncSession) -> None:
+        self._apply_placements(await db.execute(_PLACEMENTS_QUERY))
+
+    def load_placements(self, connection) -> None:
+        """
+        Sync variant for scripts
+        """
+        self._apply_placements(connection.execute(_PLACEMENTS_QUERY))
+
+    def ensure_writable(self, *owner_ids: str) -> None:
+        """
+        Refuse writes (503) for owners whose tasks are being moved
+        """
+        if self._moving and any(owner_id in self._moving for owner_id in owner_ids):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Tasks are being moved to another shard, retry shortly",
+                headers={"Retry-After": str(math.ceil(SHARD_PLACEMENT_RELOAD_INTERVAL))},
+            )
+
+    async def locate_task(self, task_id: str) -> Optional[Shard]:
+        return (await self.locate_task_owner(task_id))[0]
+
+    async def locate_task_owner(self, task_id: str) -> Tuple[Optional[Shard], Optional[str]]:
+        """
+        Shard holding `task_id` (hot or archived) and its owner; a primary
+        key probe per shard, run concurrently. While a move has the task on
+        two shards, the owner's placement shard wins. Without sharding
+        there is nothing to probe.
+        """
+        if not self.sharded:
+            return self.shards[0], None
+
+        async def probe(shard: Shard) -> Optional[str]:
+            stmt = union_all(
+                select(Task.owner_id).where(Task.id == task_id),
+                select(TaskArchive.owner_id).where(TaskArchive.id == task_id),
+            )
+            async with shard.read_session() as db:
+                return (await db.execute(stmt)).scalar()
+
+        found = await asyncio.gather(*(probe(shard) for shard in self.shards))
+        hits = [(shard, owner_id) for shard, owner_id in zip(self.shards, found) if owner_id is not None]
+        if not hits:
+            return None, None
+        owner_id = hits[0][1]
+        placed = self.shard_for(owner_id)
+        return next((shard for shard, _ in hits if shard is placed), hits[0][0]), owner_id
+
+
+_PLACEMENTS_QUERY = select(TaskShardPlacement.owner_id, TaskShardPlacement.shard, TaskShardPlacement.moving)
+
+
+def _build_router(spec: str = TASK_SHARDS) -> ShardRouter:
+    configured = parse_shards(spec)
+    if not configured:
+        primary = Shard(PRIMARY_SHARD, engine, AsyncSessionLocal, AsyncReadSessionLocal)
+        return ShardRouter([primary], sharded=False)
+    return ShardRouter(
+        [Shard(name, *create_shard_engines(name, url)) for name, url in configured],
+        sharded=True,
+    )
+
+
+shard_router = _build_router()
+
+
+# ========================
+# SESSIONS
+# ========================
+@asynccontextmanager
+async def read_sessions(db: AsyncSession, owner_id: Optional[str] = None):
+    """
+    Read sessions over `owner_id`'s shard, or over every shard when
+    owner_id is None (scatter-gather). Unsharded this is just [db], the
+    request's own session, so no extra connection is checked out.
+    """
+    if not shard_router.sharded:
+        yield [db]
+        return
+
+    shards = shard_router.shards if owner_id is None else [shard_router.shard_for(owner_id)]
+    async with AsyncExitStack() as stack:
+        yield [await stack.enter_async_context(shard.read_session()) for shard in shards]
+
+
+@asynccontextmanager
+async def read_session(db: AsyncSession, owner_id: Optional[str] = None, shard: Optional[Shard] = None):
+    """
+    Read session on `shard`, or on `owner_id`'s shard. Unsharded this is db.
+    """
+    if not shard_router.sharded:
+        yield db
+        return
+
+    shard = shard or shard_router.shard_for(owner_id)
+    async with shard.read_session() as shard_db:
+        yield shard_db
+
+
+@asynccontextmanager
+async def write_sessions(db: AsyncSession):
+    """
+    A write session per shard, for batch operations whose tasks may live
+    anywhere. Unsharded this is [db].
+    """
+    if not shard_router.sharded:
+        yield [db]
+        return
+
+    async with AsyncExitStack() as stack:
+        yield [await stack.enter_async_context(shard.session()) for shard in shard_router.shards]
+
+
+@asynccontextmanager
+async def write_session(db: AsyncSession, owner_id: Optional[str] = None, shard: Optional[Shard] = None):
+    """
+    Write session on `shard`, or on `owner_id`'s shard. Unsharded this is db.
+    Raises 503 while `owner_id`'s tasks are being moved.
+    """
+    if not shard_router.sharded:
+        yield db
+        return
+
+    if owner_id is not None:
+        shard_router.ensure_writable(owner_id)
+    shard = shard or shard_router.shard_for(owner_id)
+    async with shard.session() as shard_db:
+        yield shard_db
+
+
+# ========================
+# PLACEMENT RELOAD
+# ========================
+async def run_shard_placement_reload(interval: float = SHARD_PLACEMENT_RELOAD_INTERVAL) -> None:
+    """
+    Periodically pick up owners moved by the rebalancing tool
+    """
+    while True:
+        try:
+            async with AsyncReadSessionLocal() as db:
+                await shard_router.reload_placements(db)
+        except Exception:
+            logger.exception("Shard placement reload failed")
+        await asyncio.sleep(interval)
+
+
+def migration_targets() -> list:
+    """
+    (name, sync engine) of every database carrying the schema: the
+    primary one plus each task shard
+    """
+    targets = [(PRIMARY_SHARD, engine)]
+    if shard_router.sharded:
+        targets += [(shard.name, shard.engine) for shard in shard_router.shards]
+    return targets
+
+
+def shard_engines() -> list:
+    """
+    Sync engines holding task tables, for migrations and maintenance scripts
+    """
+    return [shard.engine for shard in shard_router.shards]
+
+
+def shard_async_engines() -> list:
+    return [shard.async_engine for shard in shard_router.shards]
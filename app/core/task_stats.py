@@ -0,0 +1,121 @@
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+
+from app.models.task_stat import GLOBAL_OWNER
+
+# ========================
+# COUNTER TRIGGERS
+# ========================
+# task_stats holds COUNT(*) per (owner_id, status, priority) plus global
+# rows under owner_id '*'. Triggers apply +1/-1 deltas in the same
+# transaction as the write, so bulk statements and the user delete
+# cascade are covered as well as the single-task endpoints.
+#
+# Archived tasks still count: tasks_archive carries the same triggers, so
+# the archive move (DELETE from tasks, INSERT into tasks_archive) nets to
+# zero and deleting an archived task takes it off the counters.
+STATS_TABLE = "task_stats"
+
+# Counted table -> trigger name prefix
+COUNTED_TABLES = {
+    "tasks": STATS_TABLE,
+    "tasks_archive": f"{STATS_TABLE}_archive",
+}
+
+
+def _bump(row: str, delta: int) -> str:
+    status = f"COALESCE({row}.status, '')"
+    priority = f"COALESCE({row}.priority, '')"
+    return "\n".join(
+        f"""
+        INSERT INTO {STATS_TABLE}(owner_id, status, priority, count)
+        VALUES ({owner}, {status}, {priority}, {delta})
+        ON CONFLICT(owner_id, status, priority) DO UPDATE SET count = count + ({delta});
+        """
+        for owner in (f"{row}.owner_id", f"'{GLOBAL_OWNER}'")
+    )
+
+
+def _ddl(table: str, prefix: str) -> tuple:
+    return (
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {prefix}_ai AFTER INSERT ON {table} BEGIN
+            {_bump("new", 1)}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {prefix}_ad AFTER DELETE ON {table} BEGIN
+            {_bump("old", -1)}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {prefix}_au AFTER UPDATE OF owner_id, status, priority ON {table}
+        WHEN old.owner_id IS NOT new.owner_id
+          OR old.status IS NOT new.status
+          OR old.priority IS NOT new.priority
+        BEGIN
+            {_bump("old", -1)}
+            {_bump("new", 1)}
+        END
+        """,
+    )
+
+
+def _counted_tables(connection: Connection) -> list:
+    existing = inspect(connection).get_table_names()
+    return [table for table in COUNTED_TABLES if table in existing]
+
+
+def install_task_stats(connection: Connection) -> bool:
+    """
+    Create the counter triggers if missing. When any are new, counters
+    are rebuilt from the counted tables. Returns True if installed.
+    """
+    if connection.dialect.name != "sqlite":
+        return False
+
+    existing = inspect(connection).get_table_names()
+    if STATS_TABLE not in existing:
+        return False
+
+    installed = False
+    for table in _counted_tables(connection):
+        prefix = COUNTED_TABLES[table]
+        present = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = ?",
+            (f"{prefix}_ai",),
+        ).first() is not None
+        for statement in _ddl(table, prefix):
+            connection.exec_driver_sql(statement)
+        installed = installed or not present
+
+    if installed:
+        reconcile_task_stats(connection)
+    return installed
+
+
+def reconcile_task_stats(connection: Connection) -> None:
+    """
+    Rebuild every counter from scratch with GROUP BY over tasks and
+    tasks_archive
+    """
+    counted = " UNION ALL ".join(
+        f"SELECT owner_id, status, priority FROM {table}" for table in _counted_tables(connection)
+    )
+    connection.exec_driver_sql(f"DELETE FROM {STATS_TABLE}")
+    connection.exec_driver_sql(
+        f"""
+        INSERT INTO {STATS_TABLE}(owner_id, status, priority, count)
+        SELECT owner_id, COALESCE(status, ''), COALESCE(priority, ''), COUNT(*)
+        FROM ({counted})
+        GROUP BY owner_id, COALESCE(status, ''), COALESCE(priority, '')
+        """
+    )
+    connection.exec_driver_sql(
+        f"""
+        INSERT INTO {STATS_TABLE}(owner_id, status, priority, count)
+        SELECT '{GLOBAL_OWNER}', COALESCE(status, ''), COALESCE(priority, ''), COUNT(*)
+        FROM ({counted})
+        GROUP BY COALESCE(status, ''), COALESCE(priority, '')
+        """
+    )
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, List, Optional, Tuple, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.metrics import metrics
+
+# ========================
+# GROUP COMMIT CONFIG
+# ========================
+# Off by default: each request commits on its own session. When enabled,
+# single-task writes are funnelled through one writer that applies them
+# in shared transactions, one fsync and one lock acquisition per batch.
+WRITE_COALESCING = os.getenv("WRITE_COALESCING", "false").lower() in ("1", "true", "yes")
+WRITE_BATCH_WINDOW_MS = float(os.getenv("WRITE_BATCH_WINDOW_MS", "2"))
+WRITE_BATCH_MAX = int(os.getenv("WRITE_BATCH_MAX", "100"))
+WRITE_QUEUE_MAX = int(os.getenv("WRITE_QUEUE_MAX", "1000"))
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+WriteOperation = Callable[[AsyncSession], Awaitable[T]]
+
+
+# ========================
+# WRITE QUEUE
+# ========================
+class WriteQueue:
+    """
+    Coalesce concurrent write operations into group commits.
+
+    Each operation runs inside its own SAVEPOINT on the writer's session,
+    so one failing caller (404, 403, constraint error) is rolled back and
+    gets its own exception while the rest of the batch still commits.
+    Callers are resolved only after the shared COMMIT succeeds.
+    """
+
+    def __init__(
+        self,
+        window_ms: float = WRITE_BATCH_WINDOW_MS,
+        max_batch: int = WRITE_BATCH_MAX,
+        max_queued: int = WRITE_QUEUE_MAX,
+    ):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.max_queued = max_queued
+        self.running = False
+        self._queue: Optional[asyncio.Queue] = None
+        self._session_factory: Optional[async_sessionmaker] = None
+
+    async def submit(self, operation: WriteOperation) -> T:
+        """
+        Enqueue `operation` and wait for its result (or exception).
+        Blocks when the queue is full, pushing back on callers.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((operation, future))
+        return await future
+
+    async def run(self) -> None:
+        from app.database import create_writer_sessionmaker
+
+        if self._session_factory is None:
+            self._session_factory = create_writer_sessionmaker()
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self.running = True
+        batch = []
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                # Give concurrent writers a few ms to join this commit
+                await asyncio.sleep(self.window)
+                while len(batch) < self.max_batch and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                await self._apply(batch)
+        finally:
+            self.running = False
+            # Writes already pulled into the batch are waited on too
+            pending = [future for _, future in batch]
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait()[1])
+            for future in pending:
+                if not future.done():
+                    future.set_exception(RuntimeError("Write queue stopped"))
+
+    async def _apply(self, batch: List[Tuple[WriteOperation, asyncio.Future]]) -> None:
+        batch = [(operation, future) for operation, future in batch if not future.cancelled()]
+        if not batch:
+            return
+        metrics.observe("write_batch_size", (), len(batch))
+
+        outcomes = []
+        try:
+            async with self._session_factory() as session:
+                for operation, future in batch:
+                    try:
+                        async with session.begin_nested():
+                            result = await operation(session)
+                        outcomes.append((future, result, None))
+                    except Exception as exc:
+                        outcomes.append((future, None, exc))
+                await session.commit()
+        except Exception as exc:
+            logger.exception("Group commit of %d writes failed", len(batch))
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for future, result, exc in outcomes:
+            if future.done():
+                continue
+            if exc is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+
+
+write_queue = WriteQueue()
+
+
+async def run_write(db: AsyncSession, operation: WriteOperation) -> T:
+    """
+    Run a write either through the group-commit writer (when running) or
+    directly on the request's session followed by its own commit
+    """
+    if write_queue.running:
+        return await write_queue.submit(operation)
+
+    result = await operation(db)
+    await db.commit()
+    return result
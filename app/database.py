@@ -1,12 +1,115 @@
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-DATABASE_URL = "sqlite:///./task_manager.db"
+from app.core.query_stats import instrument_engine
+from app.core.metrics import TimedAsyncQueuePool, TimedQueuePool, register_engine
+
+# ========================
+# ENGINE CONFIG
+# ========================
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./task_manager.db")
+
+# Optional read-only target (replica file / separate pool) for GET handlers.
+# Defaults to the primary database with its own connection pool.
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL", DATABASE_URL)
+
+# Async driver used by the API; the sync engine stays available for
+# scripts (seed_roles, migrations) via SessionLocal / get_sync_db.
+ASYNC_DATABASE_DRIVER = os.getenv("ASYNC_DATABASE_DRIVER", "sqlite+aiosqlite")
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", str(DB_POOL_SIZE)))
+
+# SQLite pragmas applied on every new connection
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-64000"))  # negative = KiB
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # ms
+
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _async_url(url: str) -> str:
+    return str(make_url(url).set(drivername=ASYNC_DATABASE_DRIVER))
+
+
+def _engine_kwargs(url: str, pool_size: int, pool_name: str, is_async: bool = True) -> dict:
+    kwargs = {}
 
+    if _is_sqlite(url):
+        kwargs["connect_args"] = {"check_same_thread": False}  # SQLite specific
+        if make_url(url).database in (None, "", ":memory:"):
+            return kwargs
+
+    kwargs.update(
+        poolclass=TimedAsyncQueuePool if is_async else TimedQueuePool,
+        pool_logging_name=pool_name,
+        pool_size=pool_size,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=not _is_sqlite(url),
+    )
+    return kwargs
+
+
+def _install_sqlite_pragmas(sync_engine, read_only: bool = False):
+    """
+    Apply journal/cache/mmap/busy pragmas whenever the pool opens a
+    connection, so WAL readers never block on writers
+    """
+    if sync_engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+
+def _install_sqlite_explicit_begin(sync_engine, begin: str = "BEGIN IMMEDIATE"):
+    """
+    Let SQLAlchemy rather than the driver emit BEGIN, so SAVEPOINTs nest
+    inside the outer transaction; IMMEDIATE takes the write lock up front
+    instead of failing on a lock upgrade halfway through
+    """
+    if sync_engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def _disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(sync_engine, "begin")
+    def _begin(connection):
+        connection.exec_driver_sql(begin)
+
+
+# ========================
+# ENGINES & SESSIONS
+# ========================
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False}  # SQLite specific
+    **_engine_kwargs(DATABASE_URL, DB_POOL_SIZE, "sync", is_async=False),
 )
+_install_sqlite_pragmas(engine)
+instrument_engine(engine)
+register_engine("sync", engine)
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -14,10 +117,103 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+async_engine = create_async_engine(
+    _async_url(DATABASE_URL),
+    **_engine_kwargs(DATABASE_URL, DB_POOL_SIZE, "primary"),
+)
+_install_sqlite_pragmas(async_engine.sync_engine)
+instrument_engine(async_engine.sync_engine)
+register_engine("primary", async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+async_read_engine = create_async_engine(
+    _async_url(READ_DATABASE_URL),
+    **_engine_kwargs(READ_DATABASE_URL, DB_READ_POOL_SIZE, "read"),
+)
+_install_sqlite_pragmas(async_read_engine.sync_engine, read_only=True)
+instrument_engine(async_read_engine.sync_engine)
+register_engine("read", async_read_engine.sync_engine)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_read_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 Base = declarative_base()
 
+
+def create_shard_engines(name: str, url: str):
+    """
+    Engines for one task shard (app.core.sharding): a sync engine for
+    migrations and scripts plus read/write async sessionmakers, configured
+    like the primary ones. Returns (sync_engine, sessionmaker, read_sessionmaker).
+    """
+    shard_engine = create_engine(url, **_engine_kwargs(url, DB_POOL_SIZE, f"shard:{name}:sync", is_async=False))
+    _install_sqlite_pragmas(shard_engine)
+    instrument_engine(shard_engine)
+
+    write_engine = create_async_engine(_async_url(url), **_engine_kwargs(url, DB_POOL_SIZE, f"shard:{name}"))
+    _install_sqlite_pragmas(write_engine.sync_engine)
+    instrument_engine(write_engine.sync_engine)
+    register_engine(f"shard:{name}", write_engine.sync_engine)
+
+    read_engine = create_async_engine(_async_url(url), **_engine_kwargs(url, DB_READ_POOL_SIZE, f"shard:{name}:read"))
+    _install_sqlite_pragmas(read_engine.sync_engine, read_only=True)
+    instrument_engine(read_engine.sync_engine)
+    register_engine(f"shard:{name}:read", read_engine.sync_engine)
+
+    session_options = dict(class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    return (
+        shard_engine,
+        async_sessionmaker(bind=write_engine, **session_options),
+        async_sessionmaker(bind=read_engine, **session_options),
+    )
+
+
+def create_writer_sessionmaker() -> async_sessionmaker:
+    """
+    Single-connection engine for the group-commit writer
+    (app.core.write_queue), created only when coalescing is enabled
+    """
+    writer_engine = create_async_engine(
+        _async_url(DATABASE_URL),
+        **_engine_kwargs(DATABASE_URL, 1, "writer"),
+    )
+    _install_sqlite_pragmas(writer_engine.sync_engine)
+    _install_sqlite_explicit_begin(writer_engine.sync_engine)
+    instrument_engine(writer_engine.sync_engine)
+    register_engine("writer", writer_engine.sync_engine)
+
+    return async_sessionmaker(
+        bind=writer_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+
 # Dependency to get DB session
-def get_db():
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Read-only session for GET handlers (separate pool / replica)
+async def get_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+# Sync session for scripts and other non-async callers
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
@@ -4,17 +4,21 @@ from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import SQLAlchemyError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
+from app.core.metrics import record_error
+
 
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     """
     Handles HTTP errors like 401, 403, 404
     """
+    record_error("http", exc.status_code)
     return JSONResponse(
         status_code=exc.status_code,
         content={
             "success": False,
             "error": exc.detail if hasattr(exc, "detail") else str(exc)
         },
+        headers=getattr(exc, "headers", None),
     )
 
 
@@ -22,6 +26,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     """
     Handles validation errors (body, query, path)
     """
+    record_error("validation", status.HTTP_422_UNPROCESSABLE_ENTITY)
     return JSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={
@@ -36,6 +41,7 @@ async def sqlalchemy_exception_handler(request: Request, exc: SQLAlchemyError):
     """
     Handles DB errors
     """
+    record_error("database", status.HTTP_500_INTERNAL_SERVER_ERROR)
     return JSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
@@ -50,6 +56,7 @@ async def generic_exception_handler(request: Request, exc: Exception):
     """
     Handles unexpected errors
     """
+    record_error("unhandled", status.HTTP_500_INTERNAL_SERVER_ERROR)
     return JSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
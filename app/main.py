@@ -1,6 +1,19 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from app.database import Base, engine
-from app.routers import auth, tasks, users
+from app.database import AsyncReadSessionLocal
+from app.routers import auth, tasks, users, metrics
+from app.auth.revocation import run_revocation_sync
+from app.auth.permissions import run_permission_reload
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.metrics import MetricsMiddleware
+from app.core.migrations import ensure_schema
+from app.core.write_queue import WRITE_COALESCING, write_queue
+from app.core.archive import ARCHIVE_INTERVAL, run_archive_compaction
+from app.core.idempotency import run_idempotency_purge
+from app.core.sharding import migration_targets, run_shard_placement_reload, shard_router
 from app.exceptions import (
     http_exception_handler,
     validation_exception_handler,
@@ -11,15 +24,55 @@ from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from sqlalchemy.exc import SQLAlchemyError
 
-# Create DB tables
-Base.metadata.create_all(bind=engine)
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Only a schema version lookup per database unless migrations are pending
+    for _, target_engine in migration_targets():
+        ensure_schema(target_engine)
+
+    # Mirror the token denylist and RBAC matrix into memory and keep them in sync
+    background_tasks = [
+        asyncio.create_task(run_revocation_sync()),
+        asyncio.create_task(run_permission_reload()),
+        # Drop stored Idempotency-Key responses past their TTL
+        asyncio.create_task(run_idempotency_purge()),
+    ]
+    # Owners pinned to a shard by the rebalancing tool
+    if shard_router.sharded:
+        async with AsyncReadSessionLocal() as db:
+            await shard_router.reload_placements(db)
+        background_tasks.append(asyncio.create_task(run_shard_placement_reload()))
+    # Optional single writer that group-commits task writes; it holds one
+    # connection to DATABASE_URL, so it does not apply to sharded tasks
+    if WRITE_COALESCING and shard_router.sharded:
+        logger.warning("WRITE_COALESCING is ignored while TASK_SHARDS is set")
+    elif WRITE_COALESCING:
+        background_tasks.append(asyncio.create_task(write_queue.run()))
+    # Optional periodic move of stale finished tasks into tasks_archive
+    if ARCHIVE_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(run_archive_compaction()))
+    try:
+        yield
+    finally:
+        for task in background_tasks:
+            task.cancel()
+
+
+app = FastAPI(title="Task Management API", version="0.1.0", lifespan=lifespan)
 
-app = FastAPI(title="Task Management API", version="0.1.0")
+# Per-request query count / DB time as Server-Timing headers
+app.add_middleware(QueryStatsMiddleware)
+# Outermost: latency histograms, in-flight and error counts for /metrics
+app.add_middleware(MetricsMiddleware)
 
 # Include routers
 app.include_router(auth.router)
 app.include_router(tasks.router)
 app.include_router(users.router)
+app.include_router(metrics.router)
 
 # ----------------------------
 # Register global exception handlers
@@ -31,5 +84,5 @@ app.add_exception_handler(Exception, generic_exception_handler)
 
 
 @app.get("/")
-def root():
+async def root():
     return {"message": "Task Management API running"}
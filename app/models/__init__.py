@@ -1,3 +1,10 @@
 from app.models.user import User
 from app.models.role import Role
 from app.models.task import Task
+from app.models.revoked_token import RevokedToken
+from app.models.permission import Permission
+from app.models.role_permission import RoleHasPermission
+from app.models.task_stat import TaskStat
+from app.models.task_archive import TaskArchive
+from app.models.task_shard_placement import TaskShardPlacement
+from app.models.idempotency_key import IdempotencyKey
@@ -0,0 +1,21 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Integer, LargeBinary
+from app.database import Base
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    # "user:<id>" for authenticated routes, "anonymous:<fingerprint>" for registration
+    scope = Column(String, primary_key=True)
+    key = Column(String, primary_key=True)
+    # HMAC of method, path and body; within a user scope a reused key with
+    # another body is rejected
+    fingerprint = Column(String, nullable=False)
+
+    # NULL while the first request is still running
+    status_code = Column(Integer, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    media_type = Column(String, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
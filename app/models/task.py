@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -19,3 +19,11 @@ class Task(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     owner = relationship("User", back_populates="tasks")
+
+    # Composite indexes backing keyset pagination on (created_at, id)
+    __table_args__ = (
+        Index("ix_tasks_owner_created_id", "owner_id", "created_at", "id"),
+        Index("ix_tasks_created_id", "created_at", "id"),
+        Index("ix_tasks_owner_status", "owner_id", "status"),
+        Index("ix_tasks_owner_updated", "owner_id", "updated_at"),
+    )
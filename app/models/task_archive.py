@@ -0,0 +1,25 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
+from app.database import Base
+
+class TaskArchive(Base):
+    __tablename__ = "tasks_archive"
+
+    # Same columns as tasks; rows are moved here by app/core/archive.py
+    id = Column(String, primary_key=True)
+    title = Column(String, nullable=False)
+    description = Column(String, nullable=True)
+    status = Column(String)
+    priority = Column(String)
+
+    owner_id = Column(String, ForeignKey("users.id"), nullable=False)
+
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Same keyset pagination indexes as the hot table
+    __table_args__ = (
+        Index("ix_tasks_archive_owner_created_id", "owner_id", "created_at", "id"),
+        Index("ix_tasks_archive_created_id", "created_at", "id"),
+    )
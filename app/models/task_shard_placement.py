@@ -0,0 +1,15 @@
+from datetime import datetime
+from sqlalchemy import Boolean, Column, String, DateTime
+from app.database import Base
+
+class TaskShardPlacement(Base):
+    __tablename__ = "task_shard_placements"
+
+    # Explicit owner -> shard pins written by the rebalancing tool;
+    # owners without a row live on their rendezvous-hash shard
+    owner_id = Column(String, primary_key=True)
+    shard = Column(String, nullable=False)
+    # Set while the tool copies the owner's tasks to another shard: their
+    # writes are refused (503) so no copy can go stale
+    moving = Column(Boolean, nullable=False, default=False, server_default="0")
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, Integer
+from app.database import Base
+
+# owner_id used for the global (all owners) rows
+GLOBAL_OWNER = "*"
+
+class TaskStat(Base):
+    __tablename__ = "task_stats"
+
+    # Materialized COUNT(*) GROUP BY owner_id, status, priority;
+    # maintained by triggers on tasks and tasks_archive (see app/core/task_stats.py)
+    owner_id = Column(String, primary_key=True)
+    status = Column(String, primary_key=True)
+    priority = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
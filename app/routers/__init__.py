@@ -1 +1 @@
-from . import auth, users, tasks
+from . import auth, users, tasks, metrics
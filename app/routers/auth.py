@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 
 from app.database import get_db
 from app.models.user import User
 from app.models.role import Role
 from app.schemas.auth import RegisterRequest, LoginRequest
-from app.auth.password import hash_password, verify_password
-from app.auth.jwt import create_access_token
+from app.auth.password import hash_password_async, verify_and_update_password_async
+from app.auth.jwt import create_access_token, get_token_payload
+from app.auth.revocation import revocation_list
+from app.core.rate_limit import rate_limit, record_failure
+from app.core.idempotency import ANONYMOUS_SCOPE, idempotent
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -14,60 +19,91 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
 # -----------------------------
 # Register User (DEFAULT ROLE = user)
 # -----------------------------
-@router.post("/register", status_code=status.HTTP_201_CREATED)
-def register(
+@router.post(
+    "/register",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit("register"))],
+)
+async def register(
     data: RegisterRequest,
-    db: Session = Depends(get_db)
+    request: Request,
+    idempotency_key: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
 ):
-    # 🔍 Check if user already exists
-    user_exists = db.query(User).filter(User.email == data.email).first()
-    if user_exists:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="User already exists"
-        )
+    async def create_user():
+        # 🔍 Check if user already exists
+        result = await db.execute(select(User).where(User.email == data.email))
+        user_exists = result.scalars().first()
+        if user_exists:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="User already exists"
+            )
 
-    # 🔑 Fetch DEFAULT role = user (MUST already exist)
-    default_role = db.query(Role).filter(Role.name == "user").first()
+        # 🔑 Fetch DEFAULT role = user (MUST already exist)
+        # Seeded as "USER"; role names are matched case-insensitively
+        result = await db.execute(select(Role).where(func.lower(Role.name) == "user"))
+        default_role = result.scalars().first()
 
-    if not default_role:
-        raise HTTPException(
-            status_code=500,
-            detail="Default role 'user' not found. Seed roles first."
+        if not default_role:
+            raise HTTPException(
+                status_code=500,
+                detail="Default role 'user' not found. Seed roles first."
+            )
+
+        # 👤 Create user
+        new_user = User(
+            email=data.email,
+            hashed_password=await hash_password_async(data.password),
+            role_id=default_role.id
         )
 
-    # 👤 Create user
-    new_user = User(
-        email=data.email,
-        hashed_password=hash_password(data.password),
-        role_id=default_role.id
-    )
+        db.add(new_user)
+        await db.commit()
+        await db.refresh(new_user)
 
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+        return {
+            "message": "User registered successfully"
+        }
 
-    return {
-        "message": "User registered successfully"
-    }
+    # ♻️ A retried registration replays the first response: no second bcrypt hash
+    return await idempotent(request, idempotency_key, ANONYMOUS_SCOPE, create_user, status_code=status.HTTP_201_CREATED)
 
 
 # -----------------------------
 # Login User
 # -----------------------------
-@router.post("/login")
-def login(
+@router.post("/login", dependencies=[Depends(rate_limit("login"))])
+async def login(
     data: LoginRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user = db.query(User).filter(User.email == data.email).first()
+    result = await db.execute(select(User).where(User.email == data.email))
+    user = result.scalars().first()
+
+    if not user:
+        record_failure("login", data.email)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid credentials"
+        )
 
-    if not user or not verify_password(data.password, user.hashed_password):
+    verified, new_hash = await verify_and_update_password_async(
+        data.password, user.hashed_password
+    )
+    if not verified:
+        # Only failures drain the per-email bucket
+        record_failure("login", data.email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
         )
 
+    # ♻️ Rehash transparently when the configured bcrypt cost changed
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+
     access_token = create_access_token(
         data={"sub": str(user.id)}
     )
@@ -76,3 +112,21 @@ def login(
         "access_token": access_token,
         "token_type": "bearer"
     }
+
+
+# -----------------------------
+# Logout (revoke current token)
+# -----------------------------
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    payload: dict = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_db)
+):
+    jti = payload.get("jti")
+    if not jti:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Token cannot be revoked"
+        )
+
+    await revocation_list.revoke(db, jti, payload["sub"], payload["exp"])
@@ -1,109 +1,687 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+import asyncio
+import heapq
+import uuid
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, func, insert, literal_column, select, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal, Optional
+from datetime import datetime
 from uuid import UUID
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.task import Task
-from app.schemas.task import TaskCreate, TaskUpdate, TaskOut
-from app.auth.dependencies import get_current_user, admin_required
-from app.models.user import User
+from app.models.task_archive import TaskArchive
+from app.models.task_stat import TaskStat, GLOBAL_OWNER
+from app.schemas.task import (
+    TaskCreate,
+    TaskUpdate,
+    TaskOut,
+    TaskPage,
+    TaskSearchPage,
+    TaskStatsOut,
+    TaskBatchCreate,
+    TaskBatchUpdate,
+    TaskBatchDelete,
+    TaskBatchResult,
+)
+from app.core.pagination import keyset_paginate, merge_pages
+from app.core.export import ExportFormat, stream_export
+from app.core.conditional import etag_matches, not_modified, set_validators, weak_etag
+from app.core.search import bm25_rank, match_clause, tasks_fts, to_match_query
+from app.core.serialization import FastJSONResponse, projection_columns, row_encoder, sparse_schema
+from app.core.write_queue import run_write
+from app.core.events import sse_stream, task_events
+from app.core.idempotency import idempotent
+from app.core.sharding import read_session, read_sessions, shard_router, write_session, write_sessions
+from app.auth.dependencies import has_permission, require_permission
+from app.auth.principal import Principal
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
+# Columns every page needs whatever ?fields= asks for (keyset cursor)
+CURSOR_COLUMNS = ("created_at", "id")
+
+FIELDS_QUERY = Query(None, description="Comma-separated subset of response fields")
+
+
+def _task_payload(task) -> dict:
+    # SSE events carry the same shape as TaskOut responses
+    return TaskOut.model_validate(task).model_dump(mode="json")
+
+
+# -----------------------------
+# List query parameters
+# -----------------------------
+class TaskListParams:
+    """
+    Shared cursor, filter and sort parameters for task list endpoints
+    """
+
+    def __init__(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = Query(50, ge=1, le=200),
+        order: Literal["asc", "desc"] = "desc",
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        updated_after: Optional[datetime] = None,
+        updated_before: Optional[datetime] = None,
+        include_archived: bool = False,
+        fields: Optional[str] = FIELDS_QUERY,
+    ):
+        self.cursor = cursor
+        self.limit = limit
+        self.order = order
+        self.status = status
+        self.priority = priority
+        self.created_after = created_after
+        self.created_before = created_before
+        self.updated_after = updated_after
+        self.updated_before = updated_before
+        self.include_archived = include_archived
+        self.schema = sparse_schema(TaskOut, fields)
+
+    @property
+    def sources(self):
+        return (Task, TaskArchive) if self.include_archived else (Task,)
+
+    def apply_filters(self, stmt, source=Task):
+        if self.status is not None:
+            stmt = stmt.where(source.status == self.status)
+        if self.priority is not None:
+            stmt = stmt.where(source.priority == self.priority)
+        if self.created_after is not None:
+            stmt = stmt.where(source.created_at >= self.created_after)
+        if self.created_before is not None:
+            stmt = stmt.where(source.created_at < self.created_before)
+        if self.updated_after is not None:
+            stmt = stmt.where(source.updated_at >= self.updated_after)
+        if self.updated_before is not None:
+            stmt = stmt.where(source.updated_at < self.updated_before)
+        return stmt
+
+    def scoped(self, source, owner_id: Optional[str], *columns):
+        """
+        SELECT `columns` from one task table, filtered and optionally
+        restricted to one owner
+        """
+        stmt = select(*columns)
+        if owner_id is not None:
+            stmt = stmt.where(source.owner_id == owner_id)
+        return self.apply_filters(stmt, source)
+
+    async def paginate(self, dbs, owner_id: Optional[str]) -> dict:
+        """
+        One keyset page per shard session with the same cursor, merged
+        """
+        if self.include_archived:
+            # Keyset pagination over hot and archived rows in one ordering
+            combined = union_all(
+                *(
+                    self.scoped(source, owner_id, *projection_columns(source, self.schema, CURSOR_COLUMNS))
+                    for source in self.sources
+                )
+            ).subquery()
+            stmt, keys = select(combined), combined.c
+        else:
+            stmt, keys = self.scoped(Task, owner_id, *projection_columns(Task, self.schema, CURSOR_COLUMNS)), Task
+
+        descending = self.order == "desc"
+        pages = await asyncio.gather(
+            *(
+                keyset_paginate(
+                    db,
+                    stmt,
+                    keys,
+                    cursor=self.cursor,
+                    limit=self.limit,
+                    descending=descending,
+                    scalars=False,
+                )
+                for db in dbs
+            )
+        )
+        items, next_cursor = merge_pages(pages, self.limit, descending)
+        return {"items": items, "next_cursor": next_cursor}
+
+    async def conditional_page(
+        self,
+        request: Request,
+        dbs,
+        scope_key: str,
+        owner_id: Optional[str] = None,
+    ) -> Response:
+        """
+        Paginate, unless the client's ETag still matches.
+
+        The validator comes from a COUNT/MAX(updated_at) aggregate over
+        the filtered set (per table when archived tasks are included), so an unchanged collection is answered with 304
+        without hydrating or serializing any task. Pages are read as
+        column tuples for the requested fields only and encoded straight
+        to JSON, skipping ORM hydration and per-item Pydantic validation.
+        `dbs` holds one session per shard to read (see read_sessions).
+        """
+        count, last_modified = 0, None
+        for db in dbs:
+            for source in self.sources:
+                aggregate = await db.execute(
+                    self.scoped(source, owner_id, func.count(source.id), func.max(source.updated_at))
+                )
+                source_count, source_modified = aggregate.one()
+                count += source_count
+                if source_modified is not None and (last_modified is None or source_modified > last_modified):
+                    last_modified = source_modified
+
+        etag = weak_etag(scope_key, count, last_modified, sorted(request.query_params.multi_items()))
+        if etag_matches(request, etag):
+            return not_modified(etag, last_modified)
+
+        page = await self.paginate(dbs, owner_id)
+        encode = row_encoder(Task, self.schema)
+        response = FastJSONResponse(
+            {"items": [encode(row) for row in page["items"]], "next_cursor": page["next_cursor"]}
+        )
+        set_validators(response, etag, last_modified)
+        return response
+
 
 # -----------------------------
 # GET all tasks (admin-only)
 # -----------------------------
-@router.get("/", response_model=List[TaskOut])
-def get_all_tasks(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(admin_required),  # 🔐 Admin only
+@router.get("/", response_model=TaskPage)
+async def get_all_tasks(
+    request: Request,
+    params: TaskListParams = Depends(),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(require_permission("tasks:read_any")),
 ):
-    tasks = db.query(Task).all()
-    return tasks
+    # Scatter-gather over every shard
+    async with read_sessions(db) as dbs:
+        return await params.conditional_page(request, dbs, "all")
 
 
 # -----------------------------
 # GET my tasks (normal user)
 # -----------------------------
-@router.get("/me", response_model=List[TaskOut])
-def get_my_tasks(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+@router.get("/me", response_model=TaskPage)
+async def get_my_tasks(
+    request: Request,
+    params: TaskListParams = Depends(),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(require_permission("tasks:read")),
+):
+    async with read_sessions(db, current_user.id) as dbs:
+        return await params.conditional_page(request, dbs, current_user.id, owner_id=current_user.id)
+
+
+# -----------------------------
+# EXPORT all tasks (admin-only, streamed)
+# -----------------------------
+@router.get("/export")
+async def export_tasks(
+    format: ExportFormat = "ndjson",
+    current_user: Principal = Depends(require_permission("tasks:export")),
+):
+    return stream_export(
+        Task,
+        TaskOut,
+        format,
+        filename="tasks",
+        session_factories=[shard.read_session_factory for shard in shard_router.shards],
+    )
+
+
+# -----------------------------
+# SEARCH tasks (FTS5, ranked by bm25)
+# -----------------------------
+@router.get("/search", response_model=TaskSearchPage)
+async def search_tasks(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(require_permission("tasks:read")),
+):
+    match_query = to_match_query(q)
+    if not match_query:
+        return {"items": [], "next_offset": None}
+
+    # Callers only see their own tasks unless granted tasks:read_any
+    own_only = not has_permission(current_user, "tasks:read_any")
+
+    async with read_sessions(db, current_user.id if own_only else None) as dbs:
+        # Across shards each one returns its best offset + limit + 1 hits and
+        # the merge applies the offset. bm25 statistics are per shard, so
+        # the cross-shard order is an approximation of a global ranking.
+        scatter = len(dbs) > 1
+        rank = bm25_rank()
+        stmt = (
+            select(Task, rank.label("rank"))
+            .join(tasks_fts, tasks_fts.c.rowid == literal_column("tasks.rowid"))
+            .where(match_clause())
+            .order_by(rank, Task.id)
+            .limit(offset + limit + 1 if scatter else limit + 1)
+            .offset(0 if scatter else offset)
+        )
+        if own_only:
+            stmt = stmt.where(Task.owner_id == current_user.id)
+
+        results = await asyncio.gather(*(shard_db.execute(stmt, {"match_query": match_query}) for shard_db in dbs))
+        hits = heapq.merge(*(result.all() for result in results), key=lambda hit: (hit.rank, hit.Task.id))
+        items = [hit.Task for hit in hits][offset if scatter else 0:]
+
+    next_offset = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_offset = offset + limit
+
+    return {"items": items, "next_offset": next_offset}
+
+
+# -----------------------------
+# Task statistics (materialized counters)
+# -----------------------------
+@router.get("/stats", response_model=TaskStatsOut)
+async def get_task_stats(
+    scope: Literal["me", "all"] = "me",
+    owner_id: Optional[UUID] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(require_permission("tasks:read")),
+):
+    if scope == "all":
+        target = GLOBAL_OWNER
+    elif owner_id is not None:
+        target = str(owner_id)
+    else:
+        target = current_user.id
+
+    # Other users' and global counts need tasks:read_any
+    if target != current_user.id and not has_permission(current_user, "tasks:read_any"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied",
+        )
+
+    by_status: dict = {}
+    by_priority: dict = {}
+    total = 0
+    # Each shard keeps its own global row; those are summed
+    async with read_sessions(db, None if target == GLOBAL_OWNER else target) as dbs:
+        for shard_db in dbs:
+            result = await shard_db.execute(
+                select(TaskStat.status, TaskStat.priority, TaskStat.count)
+                .where(TaskStat.owner_id == target, TaskStat.count > 0)
+            )
+            for task_status, priority, count in result:
+                by_status[task_status] = by_status.get(task_status, 0) + count
+                by_priority[priority] = by_priority.get(priority, 0) + count
+                total += count
+
+    return {
+        "owner_id": None if target == GLOBAL_OWNER else target,
+        "total": total,
+        "by_status": by_status,
+        "by_priority": by_priority,
+    }
+
+
+# -----------------------------
+# STREAM my task changes (Server-Sent Events)
+# -----------------------------
+@router.get("/stream")
+async def stream_my_tasks(
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(require_permission("tasks:read")),
+):
+    # Same session the principal lookup used; release its connection now
+    # instead of pinning it for the lifetime of the stream
+    await db.close()
+
+    # EventSource sends Last-Event-ID on reconnect; the query parameter
+    # covers clients that cannot set headers
+    last_event_id = last_event_id or request.query_params.get("last_event_id")
+    subscription, replay, reset = task_events.subscribe(current_user.id, last_event_id)
+
+    return StreamingResponse(
+        sse_stream(request, subscription, replay, reset),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# -----------------------------
+# BATCH helpers
+# -----------------------------
+TASK_COLUMNS = {column.name for column in Task.__table__.columns}
+
+
+async def _load_owners(db: AsyncSession, task_ids, include_archived: bool = False) -> dict:
+    """
+    Resolve owner_id for every requested task in a single query; archived
+    tasks only count when include_archived is set
+    """
+    task_ids = set(task_ids)
+    sources = (Task, TaskArchive) if include_archived else (Task,)
+    result = await db.execute(
+        union_all(
+            *(select(source.id, source.owner_id).where(source.id.in_(task_ids)) for source in sources)
+        )
+    )
+    return {row.id: row.owner_id for row in result}
+
+
+async def _locate_owners(dbs, task_ids, include_archived: bool = False):
+    """
+    owner_id and home session for every requested task across shard sessions
+    """
+    task_ids = list(task_ids)
+    owners, homes = {}, {}
+    # dbs follow shard_router.shards (a single session when unsharded)
+    for db, shard in zip(dbs, shard_router.shards):
+        for task_id, owner_id in (await _load_owners(db, task_ids, include_archived)).items():
+            # Mid-move a task sits on two shards: the placement shard wins
+            if task_id in homes and shard is not shard_router.shard_for(owner_id):
+                continue
+            owners[task_id] = owner_id
+            homes[task_id] = db
+    return owners, homes
+
+
+async def _archived_ids(dbs, task_ids) -> set:
+    """
+    Which of `task_ids` only exist in the archive, across shard sessions
+    """
+    task_ids = set(task_ids)
+    if not task_ids:
+        return set()
+    archived = set()
+    for db in dbs:
+        result = await db.execute(select(TaskArchive.id).where(TaskArchive.id.in_(task_ids)))
+        archived.update(result.scalars())
+    return archived
+
+
+def _access_status(task_id: str, owners: dict, current_user: Principal, can_act_on_any: bool, archived=()):
+    if task_id in archived:
+        return "archived"
+    if task_id not in owners:
+        return "not_found"
+    if owners[task_id] != current_user.id and not can_act_on_any:
+        return "forbidden"
+    return None
+
+
+# -----------------------------
+# BATCH create tasks
+# -----------------------------
+@router.post("/batch", response_model=TaskBatchResult)
+async def create_tasks_batch(
+    batch: TaskBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(require_permission("tasks:create")),
+):
+    now = datetime.utcnow()
+    rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "title": item.title,
+            "description": item.description,
+            "status": "pending",
+            "priority": "medium",
+            "owner_id": current_user.id,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for item in batch.items
+    ]
+
+    async with write_session(db, current_user.id) as shard_db:
+        await shard_db.execute(insert(Task), rows)
+        await shard_db.commit()
+
+    for row in rows:
+        task_events.publish(current_user.id, "task.created", _task_payload(row))
+
+    return {
+        "results": [
+            {"id": row["id"], "status": "created", "task": row}
+            for row in rows
+        ]
+    }
+
+
+# -----------------------------
+# BATCH update tasks
+# -----------------------------
+@router.put("/batch", response_model=TaskBatchResult)
+async def update_tasks_batch(
+    batch: TaskBatchUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(require_permission("tasks:update")),
 ):
-    return db.query(Task).filter(Task.owner_id == current_user.id).all()
+    can_act_on_any = has_permission(current_user, "tasks:update_any")
+    now = datetime.utcnow()
+
+    # With sharding, each shard commits its part of the batch on its own
+    async with write_sessions(db) as dbs:
+        task_ids = [str(item.id) for item in batch.items]
+        owners, homes = await _locate_owners(dbs, task_ids)
+        # Archived tasks are read-only, as with PUT /tasks/{id} (409)
+        archived = await _archived_ids(dbs, (task_id for task_id in task_ids if task_id not in owners))
+
+        results = []
+        params = []
+        for item in batch.items:
+            task_id = str(item.id)
+            denied = _access_status(task_id, owners, current_user, can_act_on_any, archived)
+            results.append({"id": task_id, "status": denied or "updated"})
+            if denied:
+                continue
+
+            values = {
+                key: value
+                for key, value in item.model_dump(exclude_unset=True, exclude={"id"}).items()
+                if key in TASK_COLUMNS
+            }
+            params.append({"id": task_id, "updated_at": now, **values})
+
+        shard_router.ensure_writable(*(owners[entry["id"]] for entry in params))
+
+        tasks = {}
+        for shard_db in dbs:
+            shard_params = [entry for entry in params if homes[entry["id"]] is shard_db]
+            if not shard_params:
+                continue
+            await shard_db.execute(update(Task), shard_params)
+            await shard_db.commit()
+
+            updated_ids = {entry["id"] for entry in shard_params}
+            result = await shard_db.execute(select(Task).where(Task.id.in_(updated_ids)))
+            tasks.update({task.id: task for task in result.scalars()})
+
+    for result in results:
+        if result["status"] == "updated":
+            result["task"] = tasks[result["id"]]
+    for task in tasks.values():
+        task_events.publish(task.owner_id, "task.updated", _task_payload(task))
+
+    return {"results": results}
+
+
+# -----------------------------
+# BATCH delete tasks
+# -----------------------------
+@router.delete("/batch", response_model=TaskBatchResult)
+async def delete_tasks_batch(
+    batch: TaskBatchDelete,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(require_permission("tasks:delete")),
+):
+    can_act_on_any = has_permission(current_user, "tasks:delete_any")
+    task_ids = [str(task_id) for task_id in batch.ids]
+
+    async with write_sessions(db) as dbs:
+        # Archived tasks are deletable too, as with DELETE /tasks/{id}
+        owners, homes = await _locate_owners(dbs, task_ids, include_archived=True)
+
+        results = []
+        allowed = set()
+        for task_id in task_ids:
+            denied = _access_status(task_id, owners, current_user, can_act_on_any)
+            results.append({"id": task_id, "status": denied or "deleted"})
+            if not denied:
+                allowed.add(task_id)
+
+        shard_router.ensure_writable(*(owners[task_id] for task_id in allowed))
+
+        for shard_db in dbs:
+            shard_ids = {task_id for task_id in allowed if homes[task_id] is shard_db}
+            if not shard_ids:
+                continue
+            for source in (Task, TaskArchive):
+                await shard_db.execute(
+                    delete(source)
+                    .where(source.id.in_(shard_ids))
+                    .execution_options(synchronize_session=False)
+                )
+            await shard_db.commit()
+
+    for task_id in allowed:
+        task_events.publish(owners[task_id], "task.deleted", {"id": task_id})
+
+    return {"results": results}
 
 
 # -----------------------------
 # GET single task
 # -----------------------------
 @router.get("/{task_id}", response_model=TaskOut)
-def get_task(
+async def get_task(
     task_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    fields: Optional[str] = FIELDS_QUERY,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(require_permission("tasks:read")),
 ):
-    task = db.query(Task).filter(Task.id == str(task_id)).first()
-    if not task:
+    schema = sparse_schema(TaskOut, fields)
+
+    shard = await shard_router.locate_task(str(task_id))
+    if shard is None:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    # Only admin or owner can access
-    if task.owner_id != current_user.id and current_user.role.name.lower() != "admin":
+    # Archived tasks stay readable by id
+    async with read_session(db, shard=shard) as shard_db:
+        for source in (Task, TaskArchive):
+            result = await shard_db.execute(
+                select(*projection_columns(source, schema, ("id", "owner_id", "updated_at")))
+                .where(source.id == str(task_id))
+            )
+            task = result.first()
+            if task:
+                break
+        else:
+            raise HTTPException(status_code=404, detail="Task not found")
+
+    # Only owner or roles granted tasks:read_any can access
+    if task.owner_id != current_user.id and not has_permission(current_user, "tasks:read_any"):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied",
         )
-    return task
+
+    # Each field set is its own representation, hence its own validator
+    etag = weak_etag(task.id, task.updated_at, *(() if schema is TaskOut else (schema.__name__,)))
+    if etag_matches(request, etag):
+        return not_modified(etag, task.updated_at)
+
+    response = FastJSONResponse(row_encoder(source, schema)(task))
+    set_validators(response, etag, task.updated_at)
+    return response
 
 
 # -----------------------------
 # CREATE task
 # -----------------------------
 @router.post("/", response_model=TaskOut, status_code=201)
-def create_task(
+async def create_task(
     task_data: TaskCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    idempotency_key: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(require_permission("tasks:create")),
 ):
-    new_task = Task(
-        title=task_data.title,
-        description=task_data.description,
-        owner_id=current_user.id,
+    async def create(db: AsyncSession):
+        new_task = Task(
+            title=task_data.title,
+            description=task_data.description,
+            owner_id=current_user.id,
+        )
+        db.add(new_task)
+        await db.flush()
+        await db.refresh(new_task)
+        return new_task
+
+    async def create_and_publish():
+        async with write_session(db, current_user.id) as shard_db:
+            new_task = await run_write(shard_db, create)
+        task_events.publish(new_task.owner_id, "task.created", _task_payload(new_task))
+        return new_task
+
+    # Retries carrying the same Idempotency-Key get the first response back
+    return await idempotent(
+        request,
+        idempotency_key,
+        f"user:{current_user.id}",
+        create_and_publish,
+        TaskOut,
+        status.HTTP_201_CREATED,
     )
-    db.add(new_task)
-    db.commit()
-    db.refresh(new_task)
-    return new_task
 
 
 # -----------------------------
 # UPDATE task
 # -----------------------------
 @router.put("/{task_id}", response_model=TaskOut)
-def update_task(
+async def update_task(
     task_id: UUID,
     task_data: TaskUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(require_permission("tasks:update")),
 ):
-    task = db.query(Task).filter(Task.id == str(task_id)).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+    async def update(db: AsyncSession):
+        task = await db.get(Task, str(task_id))
+        if not task:
+            if await db.get(TaskArchive, str(task_id)):
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Task is archived")
+            raise HTTPException(status_code=404, detail="Task not found")
 
-    # Only owner or admin can update
-    if task.owner_id != current_user.id and current_user.role.name.lower() != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You cannot update this task",
-        )
+        # Only owner or roles granted tasks:update_any can update
+        if task.owner_id != current_user.id and not has_permission(current_user, "tasks:update_any"):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You cannot update this task",
+            )
+
+        # Update fields dynamically
+        for key, value in task_data.model_dump(exclude_unset=True).items():
+            setattr(task, key, value)
 
-    # Update fields dynamically
-    for key, value in task_data.model_dump(exclude_unset=True).items():
-        setattr(task, key, value)
+        await db.flush()
+        await db.refresh(task)
+        return task
+
+    shard, owner_id = await shard_router.locate_task_owner(str(task_id))
+    if shard is None:
+        raise HTTPException(status_code=404, detail="Task not found")
 
-    db.commit()
-    db.refresh(task)
+    async with write_session(db, owner_id, shard=shard) as shard_db:
+        task = await run_write(shard_db, update)
+    task_events.publish(task.owner_id, "task.updated", _task_payload(task))
     return task
 
 
@@ -111,22 +689,32 @@ def update_task(
 # DELETE task
 # -----------------------------
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_task(
+async def delete_task(
     task_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(require_permission("tasks:delete")),
 ):
-    task = db.query(Task).filter(Task.id == str(task_id)).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+    async def remove(db: AsyncSession):
+        task = await db.get(Task, str(task_id)) or await db.get(TaskArchive, str(task_id))
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
 
-    # Only owner or admin can delete
-    if task.owner_id != current_user.id and current_user.role.name.lower() != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You cannot delete this task",
-        )
+        # Only owner or roles granted tasks:delete_any can delete
+        if task.owner_id != current_user.id and not has_permission(current_user, "tasks:delete_any"):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You cannot delete this task",
+            )
+
+        await db.delete(task)
+        await db.flush()
+        return task.owner_id
+
+    shard, owner_id = await shard_router.locate_task_owner(str(task_id))
+    if shard is None:
+        raise HTTPException(status_code=404, detail="Task not found")
 
-    db.delete(task)
-    db.commit()
+    async with write_session(db, owner_id, shard=shard) as shard_db:
+        owner_id = await run_write(shard_db, remove)
+    task_events.publish(owner_id, "task.deleted", {"id": str(task_id)})
     return None
@@ -1,51 +1,97 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from uuid import UUID
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.user import User
+from app.models.task import Task
+from app.models.task_archive import TaskArchive
+from app.models.task_shard_placement import TaskShardPlacement
 from app.schemas.user import UserOut, UserUpdate
-from app.auth.dependencies import admin_required
+from app.auth.dependencies import admin_required, require_permission
+from app.auth.principal import principal_cache
+from app.auth.password import hash_password_async
+from app.core.export import ExportFormat, stream_export
+from app.core.conditional import conditional_json
+from app.core.serialization import row_encoder, schema_columns, sparse_schema
+from app.core.sharding import shard_router, write_session
 
 router = APIRouter(
     prefix="/users",
     tags=["Users"],
-    dependencies=[Depends(admin_required)]  # 🔐 ADMIN ONLY
 )
 
 
 # =============================
 # GET ALL USERS (ADMIN)
 # =============================
-@router.get("/", response_model=List[UserOut])
-def get_users(db: Session = Depends(get_db)):
-    return db.query(User).all()
+@router.get(
+    "/",
+    response_model=List[UserOut],
+    dependencies=[Depends(require_permission("users:read"))],
+)
+async def get_users(
+    request: Request,
+    fields: Optional[str] = Query(None, description="Comma-separated subset of response fields"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    schema = sparse_schema(UserOut, fields)
+
+    # Column tuples encoded directly; no ORM objects or Pydantic models
+    result = await db.execute(select(*schema_columns(User, schema)))
+    encode = row_encoder(User, schema)
+    return conditional_json(request, [encode(row) for row in result])
+
+
+# =============================
+# EXPORT USERS (ADMIN, STREAMED)
+# =============================
+@router.get("/export", dependencies=[Depends(require_permission("users:export"))])
+async def export_users(format: ExportFormat = "ndjson"):
+    return stream_export(User, UserOut, format, filename="users")
+
+
+# =============================
+# PRINCIPAL CACHE STATS (ADMIN)
+# =============================
+@router.get("/cache/stats", dependencies=[Depends(admin_required)])
+async def get_principal_cache_stats():
+    return principal_cache.stats()
 
 
 # =============================
 # GET SINGLE USER (ADMIN)
 # =============================
-@router.get("/{user_id}", response_model=UserOut)
-def get_user(user_id: UUID, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == str(user_id)).first()
+@router.get(
+    "/{user_id}",
+    response_model=UserOut,
+    dependencies=[Depends(require_permission("users:read"))],
+)
+async def get_user(user_id: UUID, request: Request, db: AsyncSession = Depends(get_read_db)):
+    user = await db.get(User, str(user_id))
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    return user
+    return conditional_json(request, UserOut.model_validate(user))
 
 
 # =============================
 # UPDATE USER (ADMIN)
 # =============================
-@router.put("/{user_id}", response_model=UserOut)
-def update_user(
+@router.put(
+    "/{user_id}",
+    response_model=UserOut,
+    dependencies=[Depends(require_permission("users:update"))],
+)
+async def update_user(
     user_id: UUID,
     data: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    user = db.query(User).filter(User.id == str(user_id)).first()
+    user = await db.get(User, str(user_id))
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -54,23 +100,40 @@ def update_user(
         user.email = data.email
 
     if data.password:
-        from app.auth.password import hash_password
-        user.hashed_password = hash_password(data.password)
+        user.hashed_password = await hash_password_async(data.password)
+
+    await db.commit()
+    principal_cache.invalidate(user.id)
 
-    db.commit()
-    db.refresh(user)
+    await db.refresh(user)
     return user
 
 
 # =============================
 # DELETE USER (ADMIN)
 # =============================
-@router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(user_id: UUID, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == str(user_id)).first()
+@router.delete(
+    "/{user_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(require_permission("users:delete"))],
+)
+async def delete_user(user_id: UUID, db: AsyncSession = Depends(get_db)):
+    user_id = str(user_id)
+    exists = await db.scalar(select(User.id).where(User.id == user_id))
 
-    if not user:
+    if not exists:
         raise HTTPException(status_code=404, detail="User not found")
 
-    db.delete(user)
-    db.commit()
+    # Bulk deletes: an owner's tasks are never loaded into the session
+    for model in (Task, TaskArchive):
+        await db.execute(delete(model).where(model.owner_id == user_id))
+    if shard_router.sharded:
+        # The user's tasks live in their shard
+        await db.execute(delete(TaskShardPlacement).where(TaskShardPlacement.owner_id == user_id))
+        async with write_session(db, user_id) as shard_db:
+            for model in (Task, TaskArchive):
+                await shard_db.execute(delete(model).where(model.owner_id == user_id))
+            await shard_db.commit()
+    await db.execute(delete(User).where(User.id == user_id))
+    await db.commit()
+    principal_cache.invalidate(user_id)
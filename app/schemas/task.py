@@ -1,6 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import Dict, List, Literal, Optional
 from datetime import datetime
+from uuid import UUID
 
 
 # =====================
@@ -26,15 +27,98 @@ class TaskUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
     completed: Optional[bool] = None
+    status: Optional[str] = None
+    priority: Optional[str] = None
 
 
 # =====================
 # Response schema
 # =====================
 class TaskOut(TaskBase):
-    id: int
-    owner_id: int
+    id: str
+    owner_id: str
+    status: Optional[str] = None
+    priority: Optional[str] = None
     created_at: datetime
 
     class Config:
         from_attributes = True   # ✅ Pydantic v2
+
+
+# =====================
+# Paginated response
+# =====================
+class TaskPage(BaseModel):
+    items: List[TaskOut]
+    next_cursor: Optional[str] = None
+
+
+# =====================
+# Search results
+# =====================
+class TaskSearchPage(BaseModel):
+    items: List[TaskOut]
+    next_offset: Optional[int] = None
+
+
+# =====================
+# Task statistics
+# =====================
+class TaskStatsOut(BaseModel):
+    owner_id: Optional[str] = None
+    total: int
+    by_status: Dict[str, int]
+    by_priority: Dict[str, int]
+
+
+# =====================
+# Batch operations
+# =====================
+MAX_BATCH_SIZE = 500
+
+
+class TaskBatchUpdateItem(TaskUpdate):
+    id: UUID
+
+
+class TaskBatchCreate(BaseModel):
+    items: List[TaskCreate] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class TaskBatchUpdate(BaseModel):
+    items: List[TaskBatchUpdateItem] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class TaskBatchDelete(BaseModel):
+    ids: List[UUID] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class TaskBatchItemResult(BaseModel):
+    id: Optional[str] = None
+    status: Literal["created", "updated", "deleted", "not_found", "forbidden", "archived"]
+    task: Optional[TaskOut] = None
+
+
+class TaskBatchResult(BaseModel):
+    results: List[TaskBatchItemResult]
+
+
+# =====================
+# Bulk import schema
+# =====================
+class TaskImport(BaseModel):
+    id: Optional[str] = None
+    title: str
+    description: Optional[str] = None
+    status: str = "pending"
+    priority: str = "medium"
+    owner_id: Optional[str] = None
+    owner_email: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def check_owner(self):
+        if not self.owner_id and not self.owner_email:
+            raise ValueError("owner_id or owner_email is required")
+        return self
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, field_validator, model_validator
 from datetime import datetime
 from typing import Optional
 
@@ -27,3 +27,30 @@ class UserOut(UserBase):
 
     class Config:
         from_attributes = True
+
+
+# ========================
+# Bulk import schema
+# ========================
+BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+
+
+class UserImport(UserBase):
+    id: Optional[str] = None
+    role: str = "user"
+    password: Optional[str] = None
+    hashed_password: Optional[str] = None  # pre-hashed bcrypt, stored as-is
+    created_at: Optional[datetime] = None
+
+    @field_validator("hashed_password")
+    @classmethod
+    def check_bcrypt(cls, value):
+        if value is not None and not value.startswith(BCRYPT_PREFIXES):
+            raise ValueError("hashed_password must be a bcrypt hash")
+        return value
+
+    @model_validator(mode="after")
+    def check_credentials(self):
+        if not self.password and not self.hashed_password:
+            raise ValueError("password or hashed_password is required")
+        return self
@@ -0,0 +1,38 @@
+import argparse
+import os
+import sys
+
+# Add parent folder to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.migrations import upgrade_all
+from app.core.sharding import shard_engines
+from app.core.archive import (
+    ARCHIVE_AFTER_DAYS,
+    ARCHIVE_BATCH_SIZE,
+    ARCHIVE_STATUSES,
+    archive_cutoff,
+    archive_tasks,
+)
+
+def archive(after_days: float, batch_size: int):
+    try:
+        cutoff = archive_cutoff(after_days)
+        print(f"ℹ️ Archiving {', '.join(ARCHIVE_STATUSES)} tasks untouched since {cutoff:%Y-%m-%d %H:%M}")
+
+        moved = sum(archive_tasks(shard_engine, cutoff, batch_size) for shard_engine in shard_engines())
+
+        print(f"✅ Archived {moved} tasks")
+
+    except Exception as e:
+        print("❌ Error archiving tasks:", str(e))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move stale finished tasks into tasks_archive")
+    parser.add_argument("--after-days", type=float, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    upgrade_all()
+    archive(args.after_days, args.batch_size)
@@ -0,0 +1,377 @@
+"""
+Bulk import / export of users and tasks as NDJSON or CSV.
+
+    python -m app.scripts.bulk_transfer import users users.ndjson
+    python -m app.scripts.bulk_transfer import tasks tasks.csv --resume
+    python -m app.scripts.bulk_transfer export tasks tasks.ndjson
+
+Imports validate each chunk against the Pydantic schemas and write it
+with one executemany INSERT per chunk/transaction. Rows that conflict
+with existing ones are skipped, and a checkpoint file records how far
+the input has been committed so --resume can continue after a failure.
+Records without an id get a fresh one, so give ids when re-running the
+same file must not create duplicates.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+from typing import NamedTuple
+
+# Add parent folder to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.database import engine
+from app.core.sharding import shard_engines, shard_router
+from app.models import Role, User, Task
+from app.schemas.user import UserImport
+from app.schemas.task import TaskImport
+from app.auth.password import hash_password, PASSWORD_HASH_WORKERS
+from app.core.migrations import upgrade_all
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+# ========================
+# INPUT / OUTPUT
+# ========================
+def _detect_format(path: str, fmt: str = None) -> str:
+    if fmt:
+        return fmt
+    return "csv" if path.lower().endswith(".csv") else "ndjson"
+
+
+class MalformedLine(NamedTuple):
+    """
+    Stands in for an NDJSON line that is not valid JSON, so it is rejected
+    like any invalid record and still counts towards the checkpoint
+    """
+
+    line: int
+    error: str
+
+
+def read_records(path: str, fmt: str):
+    """
+    Stream input records one at a time; blank CSV cells are treated as
+    missing so schema defaults apply
+    """
+    with open(path, newline="", encoding="utf-8") as fh:
+        if fmt == "csv":
+            for row in csv.DictReader(fh):
+                yield {key: value for key, value in row.items() if value != ""}
+        else:
+            for number, line in enumerate(fh, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as exc:
+                    yield MalformedLine(number, str(exc))
+
+
+def chunked(iterable, size: int):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Checkpoint:
+    """
+    Number of input records already committed, persisted atomically
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> int:
+        try:
+            with open(self.path) as fh:
+                return int(fh.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def save(self, consumed: int) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as fh:
+            fh.write(str(consumed))
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+# ========================
+# CHUNK PREPARATION
+# ========================
+def _validate(schema, records, offset, errors):
+    """
+    (record position, parsed item) for every valid record, so later
+    rejections point back into the input like validation errors do
+    """
+    valid = []
+    for index, record in enumerate(records, start=offset):
+        if isinstance(record, MalformedLine):
+            errors.append({"record": index, "line": record.line, "error": f"Invalid JSON: {record.error}"})
+            continue
+        try:
+            valid.append((index, schema.model_validate(record)))
+        except ValidationError as exc:
+            errors.append({"record": index, "error": exc.errors(include_url=False)})
+    return valid
+
+
+def prepare_users(connection, records, offset, errors, hasher):
+    items = _validate(UserImport, records, offset, errors)
+
+    roles = {
+        name.lower(): role_id
+        for role_id, name in connection.execute(select(Role.id, Role.name))
+    }
+
+    # Only rows without a pre-hashed password cost bcrypt time
+    to_hash = [item for _, item in items if not item.hashed_password]
+    for item, hashed in zip(to_hash, hasher.map(hash_password, [i.password for i in to_hash])):
+        item.hashed_password = hashed
+
+    now = datetime.utcnow()
+    rows = []
+    for index, item in items:
+        role_id = roles.get(item.role.lower())
+        if role_id is None:
+            errors.append({"record": index, "error": f"Unknown role '{item.role}'"})
+            continue
+        rows.append(
+            {
+                "id": item.id or str(uuid.uuid4()),
+                "email": item.email,
+                "hashed_password": item.hashed_password,
+                "role_id": role_id,
+                "created_at": item.created_at or now,
+            }
+        )
+    return rows
+
+
+def prepare_tasks(connection, records, offset, errors, hasher):
+    items = _validate(TaskImport, records, offset, errors)
+
+    # Resolve every owner in the chunk with one query
+    emails = {item.owner_email for _, item in items if item.owner_email}
+    ids = {item.owner_id for _, item in items if item.owner_id}
+    owners = connection.execute(
+        select(User.id, User.email).where((User.email.in_(emails)) | (User.id.in_(ids)))
+    ).all()
+    by_email = {email: user_id for user_id, email in owners}
+    known_ids = {user_id for user_id, _ in owners}
+
+    now = datetime.utcnow()
+    rows = []
+    for index, item in items:
+        owner_id = item.owner_id or by_email.get(item.owner_email)
+        if owner_id not in known_ids:
+            errors.append({"record": index, "error": "Unknown owner"})
+            continue
+        created_at = item.created_at or now
+        rows.append(
+            {
+                "id": item.id or str(uuid.uuid4()),
+                "title": item.title,
+                "description": item.description,
+                "status": item.status,
+                "priority": item.priority,
+                "owner_id": owner_id,
+                "created_at": created_at,
+                "updated_at": item.updated_at or created_at,
+            }
+        )
+    return rows
+
+
+IMPORTERS = {
+    "users": (User, prepare_users),
+    "tasks": (Task, prepare_tasks),
+}
+
+
+def _insert_ignoring_conflicts(model):
+    if engine.dialect.name == "sqlite":
+        return sqlite_insert(model).on_conflict_do_nothing()
+    return insert(model)
+
+
+def _insert_rows(kind, connection, statement, rows) -> int:
+    """
+    Users go to the primary database, tasks to their owner's shard
+    """
+    if kind != "tasks" or not shard_router.sharded:
+        return max(connection.execute(statement, rows).rowcount, 0)
+
+    by_shard = {}
+    for row in rows:
+        by_shard.setdefault(shard_router.shard_for(row["owner_id"]), []).append(row)
+
+    inserted = 0
+    for shard, shard_rows in by_shard.items():
+        with shard.engine.begin() as shard_connection:
+            inserted += max(shard_connection.execute(statement, shard_rows).rowcount, 0)
+    return inserted
+
+
+# ========================
+# IMPORT
+# ========================
+def import_records(kind, path, fmt=None, batch_size=DEFAULT_BATCH_SIZE, resume=False, errors_path=None):
+    model, prepare = IMPORTERS[kind]
+    fmt = _detect_format(path, fmt)
+    checkpoint = Checkpoint(path + ".checkpoint")
+
+    skip = checkpoint.load() if resume else 0
+    if skip:
+        print(f"ℹ️ Resuming after {skip} committed records")
+
+    consumed, inserted, failed = skip, 0, 0
+    started = time.perf_counter()
+    statement = _insert_ignoring_conflicts(model)
+
+    errors_file = open(errors_path, "a", encoding="utf-8") if errors_path else None
+    try:
+        with ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS) as hasher:
+            records = islice(read_records(path, fmt), skip, None)
+            for chunk in chunked(records, batch_size):
+                errors = []
+                with engine.begin() as connection:
+                    rows = prepare(connection, chunk, consumed, errors, hasher)
+                    if rows:
+                        inserted += _insert_rows(kind, connection, statement, rows)
+
+                consumed += len(chunk)
+                failed += len(errors)
+                checkpoint.save(consumed)
+
+                if errors_file:
+                    for error in errors:
+                        errors_file.write(json.dumps(error, default=str) + "\n")
+
+                elapsed = time.perf_counter() - started
+                print(
+                    f"… {consumed} records read, {inserted} inserted, {failed} rejected "
+                    f"({(consumed - skip) / elapsed:,.0f} rows/s)"
+                )
+    finally:
+        if errors_file:
+            errors_file.close()
+
+    checkpoint.clear()
+    elapsed = time.perf_counter() - started
+    print(
+        f"✅ Imported {inserted} {kind} in {elapsed:.1f}s "
+        f"({(consumed - skip) / elapsed if elapsed else 0:,.0f} rows/s), {failed} rejected"
+    )
+
+
+# ========================
+# EXPORT
+# ========================
+EXPORT_QUERIES = {
+    "users": lambda: (
+        select(
+            User.id,
+            User.email,
+            User.hashed_password,
+            func.lower(Role.name).label("role"),
+            User.created_at,
+        )
+        .outerjoin(Role, User.role_id == Role.id)
+        .order_by(User.created_at, User.id)
+    ),
+    "tasks": lambda: select(*Task.__table__.columns).order_by(Task.created_at, Task.id),
+}
+
+
+def _jsonable(row: dict) -> dict:
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in row.items()
+    }
+
+
+def export_records(kind, path, fmt=None, batch_size=DEFAULT_BATCH_SIZE):
+    fmt = _detect_format(path, fmt)
+    started = time.perf_counter()
+    written = 0
+
+    # Tasks are read shard by shard, each in created_at order
+    sources = shard_engines() if kind == "tasks" else [engine]
+
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = None
+        for source in sources:
+            with source.connect() as connection:
+                result = connection.execution_options(yield_per=batch_size).execute(EXPORT_QUERIES[kind]())
+                if fmt == "csv" and writer is None:
+                    writer = csv.DictWriter(fh, fieldnames=list(result.keys()))
+                    writer.writeheader()
+
+                for partition in result.mappings().partitions():
+                    for row in partition:
+                        row = _jsonable(dict(row))
+                        if writer:
+                            writer.writerow(row)
+                        else:
+                            fh.write(json.dumps(row, separators=(",", ":")) + "\n")
+                    written += len(partition)
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Exported {written} {kind} to {path} in {elapsed:.1f}s ({written / elapsed if elapsed else 0:,.0f} rows/s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import/export users and tasks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    imp = sub.add_parser("import")
+    imp.add_argument("kind", choices=sorted(IMPORTERS))
+    imp.add_argument("path")
+    imp.add_argument("--format", choices=["ndjson", "csv"])
+    imp.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    imp.add_argument("--resume", action="store_true", help="Continue from the last checkpoint")
+    imp.add_argument("--errors", help="Append rejected records to this NDJSON file")
+
+    exp = sub.add_parser("export")
+    exp.add_argument("kind", choices=sorted(EXPORT_QUERIES))
+    exp.add_argument("path")
+    exp.add_argument("--format", choices=["ndjson", "csv"])
+    exp.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+
+    args = parser.parse_args(argv)
+
+    upgrade_all()
+    if shard_router.sharded:
+        with engine.connect() as connection:
+            shard_router.load_placements(connection)
+
+    if args.command == "import":
+        import_records(args.kind, args.path, args.format, args.batch_size, args.resume, args.errors)
+    else:
+        export_records(args.kind, args.path, args.format, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
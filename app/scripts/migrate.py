@@ -0,0 +1,57 @@
+"""
+Apply pending schema migrations (run once per deploy):
+
+    python -m app.scripts.migrate
+    python -m app.scripts.migrate --status
+"""
+
+import argparse
+import os
+import sys
+
+# Add parent folder to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.migrations import MIGRATIONS, current_version, head_version, upgrade
+from app.core.sharding import migration_targets
+
+
+def status():
+    targets = migration_targets()
+    for name, engine in targets:
+        with engine.connect() as connection:
+            version = current_version(connection)
+
+        if len(targets) > 1:
+            print(f"ℹ️ Database {name}")
+        for step in MIGRATIONS:
+            mark = "✅" if step.version <= version else "…"
+            print(f"{mark} {step.version:>3}  {step.name}")
+        print(f"ℹ️ Schema version {version} of {head_version()}")
+
+
+def migrate(target=None):
+    try:
+        # The primary database and, when TASK_SHARDS is set, every task shard
+        for name, engine in migration_targets():
+            applied = upgrade(engine, target)
+            for step in applied:
+                print(f"✅ Applied {step.version} on {name}: {step.name}")
+            if not applied:
+                print(f"ℹ️ Schema of {name} already up to date")
+
+    except Exception as e:
+        print("❌ Error applying migrations:", str(e))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply database schema migrations")
+    parser.add_argument("--status", action="store_true", help="Show applied and pending migrations")
+    parser.add_argument("--target", type=int, help="Stop at this version")
+    args = parser.parse_args()
+
+    if args.status:
+        status()
+    else:
+        migrate(args.target)
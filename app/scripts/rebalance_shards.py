@@ -0,0 +1,289 @@
+"""
+Move task owners between shards (TASK_SHARDS must be set):
+
+    python -m app.scripts.rebalance_shards status
+    python -m app.scripts.rebalance_shards move <owner_id> <shard>
+    python -m app.scripts.rebalance_shards rebalance [--include-primary]
+
+`move` pins an owner to a shard (for hot owners) and copies their hot and
+archived tasks over. The owner is fenced first: their placement is flagged
+`moving`, and once every worker has reloaded placements their writes get
+503 until the copy is done, so no copy can miss or overwrite a write. The
+pin then moves to the target and, after another reload window, the old
+rows are deleted. Pass --no-wait only when no workers are running.
+
+`rebalance` moves every owner whose tasks sit on a shard other than the
+one they now map to, e.g. after adding a shard to TASK_SHARDS, fencing
+them all the same way. With
+--include-primary the tasks still in DATABASE_URL are moved out as well,
+which is how an unsharded deployment is first split.
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+# Add parent folder to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.database import SQLITE_BUSY_TIMEOUT, engine
+from app.models import Task, TaskArchive, TaskShardPlacement
+from app.core.migrations import upgrade_all
+from app.core.sharding import PRIMARY_SHARD, SHARD_PLACEMENT_RELOAD_INTERVAL, shard_router
+
+TASK_TABLES = (Task, TaskArchive)
+COPY_CHUNK_SIZE = 1000
+# Every worker reloads placements within the interval; a write that passed
+# the fence check just before may still wait busy_timeout for the lock
+FENCE_WAIT = SHARD_PLACEMENT_RELOAD_INTERVAL + SQLITE_BUSY_TIMEOUT / 1000 + 1  # seconds
+
+
+def _sources(include_primary=False):
+    sources = [(shard.name, shard.engine) for shard in shard_router.shards]
+    if include_primary:
+        sources.append((PRIMARY_SHARD, engine))
+    return sources
+
+
+def _owners(source_engine):
+    with source_engine.connect() as connection:
+        owners = set()
+        for model in TASK_TABLES:
+            owners.update(connection.execute(select(model.owner_id).distinct()).scalars())
+        return owners
+
+
+# ========================
+# COPY & DELETE
+# ========================
+def copy_owner(owner_id, source_engine, target_engine) -> int:
+    """
+    Upsert the owner's rows into the target; UPDATEs on conflict keep the
+    search index and counter triggers on the target consistent
+    """
+    copied = 0
+    with source_engine.connect() as source, target_engine.begin() as target:
+        for model in TASK_TABLES:
+            table = model.__table__
+            statement = sqlite_insert(table)
+            statement = statement.on_conflict_do_update(
+                index_elements=[table.c.id],
+                set_={column.name: statement.excluded[column.name] for column in table.columns if column.name != "id"},
+            )
+            result = source.execution_options(yield_per=COPY_CHUNK_SIZE).execute(
+                select(table).where(table.c.owner_id == owner_id)
+            )
+            for partition in result.mappings().partitions():
+                target.execute(statement, [dict(row) for row in partition])
+                copied += len(partition)
+    return copied
+
+
+def delete_owner(owner_id, source_engine) -> None:
+    with source_engine.begin() as connection:
+        for model in TASK_TABLES:
+            connection.execute(delete(model).where(model.owner_id == owner_id))
+
+
+def _write_placement(connection, owner_id, shard_name, moving=False) -> None:
+    connection.execute(delete(TaskShardPlacement).where(TaskShardPlacement.owner_id == owner_id))
+    # Owners back on their hash shard need no pin, unless fenced
+    if moving or shard_router.home_shard(owner_id).name != shard_name:
+        connection.execute(
+            TaskShardPlacement.__table__.insert(),
+            {"owner_id": owner_id, "shard": shard_name, "moving": moving, "updated_at": datetime.utcnow()},
+        )
+
+
+def set_placement(owner_id, shard_name) -> None:
+    with engine.begin() as connection:
+        _write_placement(connection, owner_id, shard_name)
+
+
+# ========================
+# WRITE FENCE
+# ========================
+def fence(owner_ids) -> dict:
+    """
+    Flag the owners as moving, keeping their current routing. Returns
+    their previous placement rows for unfence().
+    """
+    owner_ids = list(owner_ids)
+    with engine.begin() as connection:
+        previous = {
+            owner_id: shard
+            for owner_id, shard in connection.execute(
+                select(TaskShardPlacement.owner_id, TaskShardPlacement.shard).where(
+                    TaskShardPlacement.owner_id.in_(owner_ids)
+                )
+            )
+        }
+        for owner_id in owner_ids:
+            _write_placement(connection, owner_id, shard_router.shard_for(owner_id).name, moving=True)
+    return previous
+
+
+def unfence(owner_ids, previous: dict) -> None:
+    """
+    Lift the fence without moving anybody (a move failed half-way)
+    """
+    with engine.begin() as connection:
+        for owner_id in owner_ids:
+            connection.execute(delete(TaskShardPlacement).where(TaskShardPlacement.owner_id == owner_id))
+            if owner_id in previous:
+                connection.execute(
+                    TaskShardPlacement.__table__.insert(),
+                    {"owner_id": owner_id, "shard": previous[owner_id], "updated_at": datetime.utcnow()},
+                )
+
+
+def wait_for_workers(wait: bool) -> None:
+    if wait:
+        print(f"ℹ️ Waiting {FENCE_WAIT:.0f}s for workers to reload placements")
+        time.sleep(FENCE_WAIT)
+
+
+# ========================
+# COMMANDS
+# ========================
+def status():
+    for name, source_engine in _sources(include_primary=True):
+        with source_engine.connect() as connection:
+            hot = connection.execute(select(func.count()).select_from(Task)).scalar()
+            archived = connection.execute(select(func.count()).select_from(TaskArchive)).scalar()
+        owners = _owners(source_engine)
+        misplaced = sum(1 for owner_id in owners if shard_router.shard_for(owner_id).name != name)
+        print(f"ℹ️ {name}: {hot} tasks, {archived} archived, {len(owners)} owners, {misplaced} to move")
+
+
+def move(owner_id, shard_name, wait=True):
+    try:
+        target = shard_router.get(shard_name)
+        sources = [
+            (name, source_engine)
+            for name, source_engine in _sources(include_primary=True)
+            if name != target.name and owner_id in _owners(source_engine)
+        ]
+        if not sources:
+            set_placement(owner_id, target.name)
+            print(f"✅ {owner_id} now placed on {target.name}")
+            return
+
+        # ----------------------------
+        # 1️⃣ Fence the owner's writes
+        # ----------------------------
+        previous = fence([owner_id])
+        wait_for_workers(wait)
+
+        # ----------------------------
+        # 2️⃣ Copy tasks to the target shard (nothing writes them now)
+        # ----------------------------
+        try:
+            for name, source_engine in sources:
+                copied = copy_owner(owner_id, source_engine, target.engine)
+                print(f"… copied {copied} tasks from {name} to {target.name}")
+        except Exception:
+            unfence([owner_id], previous)
+            raise
+
+        # ----------------------------
+        # 3️⃣ Route the owner to the target shard and lift the fence
+        # ----------------------------
+        set_placement(owner_id, target.name)
+        print(f"✅ {owner_id} now placed on {target.name}")
+
+        # ----------------------------
+        # 4️⃣ Remove the old copies once no worker reads them
+        # ----------------------------
+        wait_for_workers(wait)
+        for name, source_engine in sources:
+            delete_owner(owner_id, source_engine)
+            print(f"✅ Removed {owner_id}'s tasks from {name}")
+
+    except Exception as e:
+        print("❌ Error moving owner:", str(e))
+        sys.exit(1)
+
+
+def rebalance(include_primary=False, dry_run=False, wait=True):
+    try:
+        plan = []
+        for name, source_engine in _sources(include_primary):
+            for owner_id in sorted(_owners(source_engine)):
+                target = shard_router.shard_for(owner_id)
+                if target.name != name:
+                    plan.append((owner_id, name, source_engine, target))
+
+        if dry_run:
+            for owner_id, name, _, target in plan:
+                print(f"… would move {owner_id} from {name} to {target.name}")
+            print(f"✅ Would move {len(plan)} owners")
+            return
+        if not plan:
+            print("✅ Moved 0 owners")
+            return
+
+        # Same steps as `move`, for every misplaced owner at once
+        owner_ids = sorted({owner_id for owner_id, _, _, _ in plan})
+        previous = fence(owner_ids)
+        wait_for_workers(wait)
+
+        try:
+            for owner_id, name, source_engine, target in plan:
+                copied = copy_owner(owner_id, source_engine, target.engine)
+                print(f"… copied {copied} tasks of {owner_id} from {name} to {target.name}")
+        except Exception:
+            unfence(owner_ids, previous)
+            raise
+
+        for owner_id, _, _, target in plan:
+            set_placement(owner_id, target.name)
+
+        wait_for_workers(wait)
+        for owner_id, name, source_engine, target in plan:
+            delete_owner(owner_id, source_engine)
+
+        print(f"✅ Moved {len(owner_ids)} owners")
+
+    except Exception as e:
+        print("❌ Error rebalancing shards:", str(e))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move task owners between shards")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("status", help="Tasks and owners per shard")
+
+    mv = sub.add_parser("move", help="Pin an owner to a shard and move their tasks")
+    mv.add_argument("owner_id")
+    mv.add_argument("shard")
+    mv.add_argument("--no-wait", action="store_true", help="Skip the placement reload wait (no workers running)")
+
+    rb = sub.add_parser("rebalance", help="Move owners onto the shard they map to")
+    rb.add_argument("--include-primary", action="store_true", help="Also move tasks out of DATABASE_URL")
+    rb.add_argument("--dry-run", action="store_true")
+    rb.add_argument("--no-wait", action="store_true", help="Skip the placement reload wait (no workers running)")
+
+    args = parser.parse_args()
+
+    if not shard_router.sharded:
+        print("❌ TASK_SHARDS is not set")
+        sys.exit(1)
+
+    upgrade_all()
+    with engine.connect() as connection:
+        shard_router.load_placements(connection)
+
+    if args.command == "status":
+        status()
+    elif args.command == "move":
+        move(args.owner_id, args.shard, wait=not args.no_wait)
+    else:
+        rebalance(args.include_primary, args.dry_run, wait=not args.no_wait)
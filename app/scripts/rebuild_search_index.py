@@ -0,0 +1,35 @@
+import os
+import sys
+
+# Add parent folder to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.migrations import upgrade_all
+from app.core.sharding import shard_engines
+from app.core.search import install_search_index, rebuild_search_index
+
+def rebuild():
+    try:
+        # Every database holding tasks (the primary one unless sharded)
+        for shard_engine in shard_engines():
+            with shard_engine.begin() as connection:
+                # ----------------------------
+                # 1️⃣ Create FTS table & triggers
+                # ----------------------------
+                created = install_search_index(connection)
+
+                # ----------------------------
+                # 2️⃣ Re-index every task
+                # ----------------------------
+                if not created:
+                    rebuild_search_index(connection)
+
+        print("✅ Task search index rebuilt successfully!")
+
+    except Exception as e:
+        print("❌ Error rebuilding search index:", str(e))
+
+
+if __name__ == "__main__":
+    upgrade_all()
+    rebuild()
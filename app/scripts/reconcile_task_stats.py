@@ -0,0 +1,35 @@
+import os
+import sys
+
+# Add parent folder to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.migrations import upgrade_all
+from app.core.sharding import shard_engines
+from app.core.task_stats import install_task_stats, reconcile_task_stats
+
+def reconcile():
+    try:
+        # Every database holding tasks (the primary one unless sharded)
+        for shard_engine in shard_engines():
+            with shard_engine.begin() as connection:
+                # ----------------------------
+                # 1️⃣ Ensure counter triggers exist
+                # ----------------------------
+                installed = install_task_stats(connection)
+
+                # ----------------------------
+                # 2️⃣ Rebuild counters from tasks and tasks_archive
+                # ----------------------------
+                if not installed:
+                    reconcile_task_stats(connection)
+
+        print("✅ Task statistics reconciled successfully!")
+
+    except Exception as e:
+        print("❌ Error reconciling task statistics:", str(e))
+
+
+if __name__ == "__main__":
+    upgrade_all()
+    reconcile()
@@ -7,13 +7,14 @@ from datetime import datetime
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sqlalchemy.orm import Session
-from app.database import SessionLocal, engine, Base
+from app.database import SessionLocal, engine
 from app.models.role import Role
 from app.models.user import User
+from app.models.permission import Permission
+from app.models.role_permission import RoleHasPermission
+from app.auth.permissions import PERMISSIONS, DEFAULT_ROLE_PERMISSIONS
 from app.auth.password import hash_password
-
-# Create tables if they don't exist
-Base.metadata.create_all(bind=engine)
+from app.core.migrations import upgrade
 
 def seed_roles_and_admin():
     db: Session = SessionLocal()
@@ -34,7 +35,31 @@ def seed_roles_and_admin():
         db.commit()
 
         # ----------------------------
-        # 2️⃣ Create initial admin user
+        # 2️⃣ Seed Permissions & default grants
+        # ----------------------------
+        existing = {p.name: p for p in db.query(Permission).all()}
+        for permission_name in PERMISSIONS:
+            if permission_name not in existing:
+                existing[permission_name] = Permission(
+                    id=str(uuid.uuid4()),
+                    name=permission_name
+                )
+                db.add(existing[permission_name])
+        db.flush()
+
+        for role in db.query(Role).all():
+            granted = {
+                row.permission_id
+                for row in db.query(RoleHasPermission).filter(RoleHasPermission.role_id == role.id)
+            }
+            for permission_name in DEFAULT_ROLE_PERMISSIONS.get(role.name.lower(), ()):
+                permission_id = existing[permission_name].id
+                if permission_id not in granted:
+                    db.add(RoleHasPermission(role_id=role.id, permission_id=permission_id))
+        db.commit()
+
+        # ----------------------------
+        # 3️⃣ Create initial admin user
         # ----------------------------
         admin_email = "admin@example.com"
         admin_password = "Admin@123"  # You can change this
@@ -55,7 +80,7 @@ def seed_roles_and_admin():
         else:
             print(f"ℹ️ Admin user already exists: {admin_email}")
 
-        print("✅ Roles seeded successfully!")
+        print("✅ Roles and permissions seeded successfully!")
 
     except Exception as e:
         print("❌ Error seeding roles/admin:", str(e))
@@ -65,4 +90,5 @@ def seed_roles_and_admin():
 
 
 if __name__ == "__main__":
+    upgrade(engine)
     seed_roles_and_admin()
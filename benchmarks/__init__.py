@@ -0,0 +1,6 @@
+"""
+Reproducible load-test / benchmark suite for the Task Management API.
+
+    python -m benchmarks run --users 200 --tasks-per-user 50 --output bench.json
+    python -m benchmarks compare bench.json baseline.json
+"""
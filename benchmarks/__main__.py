@@ -0,0 +1,127 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from benchmarks.compare import compare
+
+
+def _print_table(results) -> None:
+    header = f"{'endpoint':<22}{'req':>7}{'err':>6}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'q/req':>8}"
+    print(header)
+    print("-" * len(header))
+    for row in results:
+        print(
+            f"{row['endpoint']:<22}{row['requests']:>7}{row['errors']:>6}"
+            f"{row['throughput_rps']:>10}{row['p50_ms']:>10}{row['p95_ms']:>10}"
+            f"{row['p99_ms']:>10}{str(row['queries_per_request']):>8}"
+        )
+
+
+def _report_regressions(current: dict, baseline_path: str, threshold: float) -> int:
+    with open(baseline_path) as fh:
+        baseline = json.load(fh)
+    regressions = compare(current, baseline, threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) vs {baseline_path}:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    print(f"\n✅ No regressions vs {baseline_path} (threshold {threshold:.0%})")
+    return 0
+
+
+# ========================
+# COMMANDS
+# ========================
+def cmd_run(args) -> int:
+    workdir = tempfile.mkdtemp(prefix="task-bench-")
+    db_path = os.path.join(workdir, "bench.db")
+
+    # Must be set before the app (and its engines) is imported
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    if args.bcrypt_rounds:
+        os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    # The login scenario comes from a single client address
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+    from app.database import engine
+    from benchmarks.dataset import build_dataset
+    from benchmarks.runner import run_suite
+
+    started = time.perf_counter()
+    dataset = build_dataset(engine, args.users, args.tasks_per_user, seed=args.seed)
+    print(f"Dataset: {args.users} users x {args.tasks_per_user} tasks in {time.perf_counter() - started:.1f}s ({db_path})")
+
+    from app.main import app
+
+    results = asyncio.run(
+        run_suite(app, dataset, args.requests, args.concurrency, endpoints=args.endpoint)
+    )
+    _print_table(results)
+
+    report = {
+        "config": {
+            "users": args.users,
+            "tasks_per_user": args.tasks_per_user,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "bcrypt_rounds": os.environ.get("BCRYPT_ROUNDS"),
+        },
+        "environment": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"\nSaved results to {args.output}")
+
+    if args.baseline:
+        return _report_regressions(report, args.baseline, args.threshold)
+    return 0
+
+
+def cmd_compare(args) -> int:
+    with open(args.current) as fh:
+        current = json.load(fh)
+    _print_table(current["results"])
+    return _report_regressions(current, args.baseline, args.threshold)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Generate a dataset and benchmark the API")
+    run.add_argument("--users", type=int, default=100)
+    run.add_argument("--tasks-per-user", type=int, default=50)
+    run.add_argument("--requests", type=int, default=500, help="Requests per endpoint")
+    run.add_argument("--concurrency", type=int, default=10)
+    run.add_argument("--seed", type=int, default=1234)
+    run.add_argument("--bcrypt-rounds", type=int, default=None, help="Override BCRYPT_ROUNDS")
+    run.add_argument("--endpoint", action="append", help="Only run this endpoint (repeatable)")
+    run.add_argument("--output", help="Write results JSON here")
+    run.add_argument("--baseline", help="Compare against a stored results JSON")
+    run.add_argument("--threshold", type=float, default=0.10, help="Allowed regression fraction")
+    run.set_defaults(func=cmd_run)
+
+    cmp_ = sub.add_parser("compare", help="Compare two stored results files")
+    cmp_.add_argument("current")
+    cmp_.add_argument("baseline")
+    cmp_.add_argument("--threshold", type=float, default=0.10)
+    cmp_.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
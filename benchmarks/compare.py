@@ -0,0 +1,38 @@
+from typing import List
+
+
+# ========================
+# REGRESSION CHECK
+# ========================
+def compare(current: dict, baseline: dict, threshold: float = 0.10) -> List[str]:
+    """
+    Flag endpoints whose p95 latency or queries/request grew, or whose
+    throughput dropped, by more than `threshold` (a fraction) vs baseline
+    """
+    previous = {row["endpoint"]: row for row in baseline["results"]}
+    regressions = []
+
+    for row in current["results"]:
+        base = previous.get(row["endpoint"])
+        if base is None:
+            continue
+
+        if base["p95_ms"] and row["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            regressions.append(
+                f"{row['endpoint']}: p95 {base['p95_ms']}ms -> {row['p95_ms']}ms"
+            )
+        if base["throughput_rps"] and row["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+            regressions.append(
+                f"{row['endpoint']}: throughput {base['throughput_rps']} -> {row['throughput_rps']} req/s"
+            )
+        if (
+            base.get("queries_per_request") is not None
+            and row.get("queries_per_request") is not None
+            and row["queries_per_request"] > base["queries_per_request"]
+        ):
+            regressions.append(
+                f"{row['endpoint']}: queries/request "
+                f"{base['queries_per_request']} -> {row['queries_per_request']}"
+            )
+
+    return regressions
@@ -0,0 +1,92 @@
+import random
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+BENCH_PASSWORD = "bench-password"
+ADMIN_EMAIL = "bench-admin@example.com"
+
+STATUSES = ("pending", "in_progress", "done")
+PRIORITIES = ("low", "medium", "high")
+
+
+# ========================
+# SYNTHETIC DATASET
+# ========================
+def build_dataset(engine, users: int, tasks_per_user: int, seed: int = 1234) -> dict:
+    """
+    Populate an empty database with one admin, `users` regular users and
+    `tasks_per_user` tasks each, using Core executemany inserts.
+
+    The password is hashed once and shared by every account so building
+    a large dataset does not spend minutes in bcrypt.
+    """
+    from app.core.migrations import upgrade
+    from app.models import Role, User, Task
+    from app.auth.password import hash_password
+
+    rng = random.Random(seed)
+    upgrade(engine)
+
+    hashed = hash_password(BENCH_PASSWORD)
+    admin_role_id = str(uuid.uuid4())
+    user_role_id = str(uuid.uuid4())
+    start = datetime(2024, 1, 1)
+
+    user_rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "email": ADMIN_EMAIL,
+            "hashed_password": hashed,
+            "role_id": admin_role_id,
+            "created_at": start,
+        }
+    ]
+    user_rows += [
+        {
+            "id": str(uuid.uuid4()),
+            "email": f"bench-user-{i}@example.com",
+            "hashed_password": hashed,
+            "role_id": user_role_id,
+            "created_at": start + timedelta(seconds=i),
+        }
+        for i in range(users)
+    ]
+
+    with engine.begin() as connection:
+        connection.execute(
+            insert(Role),
+            [{"id": admin_role_id, "name": "admin"}, {"id": user_role_id, "name": "user"}],
+        )
+        connection.execute(insert(User), user_rows)
+
+        batch = []
+        for owner in user_rows[1:]:
+            for j in range(tasks_per_user):
+                created = start + timedelta(minutes=rng.randint(0, 525600))
+                batch.append(
+                    {
+                        "id": str(uuid.uuid4()),
+                        "title": f"Task {j} for {owner['email']}",
+                        "description": "lorem ipsum " * rng.randint(1, 20),
+                        "status": rng.choice(STATUSES),
+                        "priority": rng.choice(PRIORITIES),
+                        "owner_id": owner["id"],
+                        "created_at": created,
+                        "updated_at": created,
+                    }
+                )
+                if len(batch) >= 5000:
+                    connection.execute(insert(Task), batch)
+                    batch = []
+        if batch:
+            connection.execute(insert(Task), batch)
+
+    return {
+        "admin_email": ADMIN_EMAIL,
+        "user_emails": [row["email"] for row in user_rows[1:]],
+        "password": BENCH_PASSWORD,
+        "users": users,
+        "tasks_per_user": tasks_per_user,
+    }
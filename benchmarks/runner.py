@@ -0,0 +1,119 @@
+import asyncio
+import re
+import time
+from typing import Callable, Dict, List
+
+import httpx
+
+_QUERY_COUNT = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+# ========================
+# STATISTICS
+# ========================
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(name: str, latencies: List[float], queries: List[int], errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    total = len(latencies)
+    return {
+        "endpoint": name,
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+
+# ========================
+# LOAD DRIVER
+# ========================
+async def run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    send: Callable[[httpx.AsyncClient, int], "asyncio.Future"],
+    requests: int,
+    concurrency: int,
+) -> dict:
+    """
+    Issue `requests` calls of `send` with at most `concurrency` in flight
+    """
+    latencies: List[float] = []
+    queries: List[int] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            response = await send(client, i)
+            latencies.append(time.perf_counter() - started)
+
+            if response.status_code >= 400:
+                errors += 1
+            match = _QUERY_COUNT.search(response.headers.get("server-timing", ""))
+            if match:
+                queries.append(int(match.group(1)))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(name, latencies, queries, errors, time.perf_counter() - started)
+
+
+async def _login(client: httpx.AsyncClient, email: str, password: str) -> Dict[str, str]:
+    response = await client.post("/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def build_scenarios(dataset: dict, user_headers: List[Dict[str, str]], admin_headers: Dict[str, str]) -> dict:
+    emails = dataset["user_emails"]
+    password = dataset["password"]
+
+    def login(client, i):
+        return client.post("/auth/login", json={"email": emails[i % len(emails)], "password": password})
+
+    def tasks_me(client, i):
+        return client.get("/tasks/me", headers=user_headers[i % len(user_headers)])
+
+    def tasks_all(client, i):
+        return client.get("/tasks/", headers=admin_headers)
+
+    return {
+        "POST /auth/login": login,
+        "GET /tasks/me": tasks_me,
+        "GET /tasks/": tasks_all,
+    }
+
+
+async def run_suite(app, dataset: dict, requests: int, concurrency: int, endpoints=None) -> List[dict]:
+    """
+    Drive the real ASGI app in-process (lifespan included) and return one
+    summary per endpoint
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            sample = dataset["user_emails"][: max(1, min(concurrency, len(dataset["user_emails"])))]
+            user_headers = [await _login(client, email, dataset["password"]) for email in sample]
+            admin_headers = await _login(client, dataset["admin_email"], dataset["password"])
+
+            scenarios = build_scenarios(dataset, user_headers, admin_headers)
+            results = []
+            for name, send in scenarios.items():
+                if endpoints and name not in endpoints:
+                    continue
+                results.append(await run_scenario(client, name, send, requests, concurrency))
+            return results
@@ -0,0 +1,50 @@
+import os
+import tempfile
+
+import pytest
+
+# Must be set before the app (and its engines) is imported
+_workdir = tempfile.mkdtemp(prefix="task-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+# Keep background loops quiet so query counts only see the request
+os.environ.setdefault("REVOCATION_SYNC_INTERVAL", "3600")
+os.environ.setdefault("PERMISSION_RELOAD_INTERVAL", "3600")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.database import engine  # noqa: E402
+from benchmarks.dataset import build_dataset  # noqa: E402
+
+USERS = 5
+TASKS_PER_USER = 30
+
+
+@pytest.fixture(scope="session")
+def dataset():
+    return build_dataset(engine, USERS, TASKS_PER_USER)
+
+
+@pytest.fixture(scope="session")
+def client(dataset):
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+def login(client, email, password):
+    response = client.post("/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def user_headers(client, dataset):
+    return login(client, dataset["user_emails"][0], dataset["password"])
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client, dataset):
+    return login(client, dataset["admin_email"], dataset["password"])
@@ -0,0 +1,40 @@
+import json
+
+from app.scripts.bulk_transfer import import_records
+
+
+def _import(tmp_path, kind, lines, batch_size=2):
+    source = tmp_path / f"{kind}.ndjson"
+    source.write_text("\n".join(lines) + "\n")
+    errors = tmp_path / "errors.ndjson"
+    import_records(kind, str(source), batch_size=batch_size, errors_path=str(errors))
+    return [json.loads(line) for line in errors.read_text().splitlines()]
+
+
+def test_malformed_json_line_is_rejected_not_fatal(dataset, tmp_path):
+    errors = _import(
+        tmp_path,
+        "users",
+        [
+            json.dumps({"email": "bulk-ok-1@example.com", "password": "secret123"}),
+            '{"email": "bulk-broken@example.com",',
+            json.dumps({"email": "bulk-ok-2@example.com", "password": "secret123"}),
+        ],
+    )
+    assert len(errors) == 1
+    assert errors[0]["record"] == 1
+    assert errors[0]["line"] == 2
+    assert not (tmp_path / "users.ndjson.checkpoint").exists()
+
+
+def test_rejections_carry_record_position(dataset, tmp_path):
+    errors = _import(
+        tmp_path,
+        "users",
+        [
+            json.dumps({"email": "not-an-email"}),
+            json.dumps({"email": "bulk-ok-3@example.com", "password": "secret123"}),
+            json.dumps({"email": "bulk-role@example.com", "password": "secret123", "role": "wizard"}),
+        ],
+    )
+    assert [error["record"] for error in errors] == [0, 2]
@@ -0,0 +1,25 @@
+from app.core.idempotency import REPLAY_HEADER, idempotency_store
+
+
+def test_retry_is_replayed_from_the_database(client, user_headers):
+    headers = {**user_headers, "Idempotency-Key": "retry-from-db"}
+    first = client.post("/tasks/", json={"title": "idempotent"}, headers=headers)
+    assert first.status_code == 201
+
+    # As if the retry reached another worker: the claim INSERT conflicts
+    idempotency_store._cache.clear()
+    retry = client.post("/tasks/", json={"title": "idempotent"}, headers=headers)
+    assert retry.status_code == 201
+    assert retry.headers.get(REPLAY_HEADER) == "true"
+    assert retry.json() == first.json()
+
+    other = client.post("/tasks/", json={"title": "something else"}, headers=headers)
+    assert other.status_code == 422
+
+
+def test_anonymous_clients_do_not_share_keys(client):
+    headers = {"Idempotency-Key": "shared-anonymous-key"}
+    first = client.post("/auth/register", json={"email": "anon-1@example.com", "password": "Secret123!"}, headers=headers)
+    second = client.post("/auth/register", json={"email": "anon-2@example.com", "password": "Secret123!"}, headers=headers)
+    assert first.status_code == second.status_code == 201
+    assert REPLAY_HEADER not in second.headers
@@ -0,0 +1,10 @@
+def test_pool_overflow_gauge_is_never_negative(client):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    overflow = [
+        float(line.rsplit(" ", 1)[1])
+        for line in response.text.splitlines()
+        if line.startswith("db_pool_connections") and 'state="overflow"' in line
+    ]
+    assert overflow
+    assert all(value >= 0 for value in overflow)
@@ -0,0 +1,67 @@
+"""
+Query budgets for the hot endpoints: a change that turns one of them
+into a per-row (N+1) query pattern fails here instead of in production.
+"""
+from app.core.query_stats import assert_max_queries
+
+
+def _my_task_ids(client, headers, limit=20):
+    response = client.get("/tasks/me", params={"limit": limit}, headers=headers)
+    assert response.status_code == 200, response.text
+    return [task["id"] for task in response.json()["items"]]
+
+
+def test_list_my_tasks_budget(client, user_headers):
+    # Warm the principal cache so only the page itself is counted
+    client.get("/tasks/me", headers=user_headers)
+    with assert_max_queries(2):
+        response = client.get("/tasks/me", params={"limit": 20}, headers=user_headers)
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 20
+
+
+def test_list_all_tasks_budget(client, admin_headers):
+    client.get("/tasks/", headers=admin_headers)
+    with assert_max_queries(2):
+        response = client.get("/tasks/", params={"limit": 100}, headers=admin_headers)
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 100
+
+
+def test_get_task_budget(client, user_headers):
+    task_id = _my_task_ids(client, user_headers, limit=1)[0]
+    with assert_max_queries(1):
+        response = client.get(f"/tasks/{task_id}", headers=user_headers)
+    assert response.status_code == 200
+
+
+def test_batch_update_budget_is_flat(client, user_headers):
+    task_ids = _my_task_ids(client, user_headers)
+    items = [{"id": task_id, "status": "in_progress"} for task_id in task_ids]
+
+    with assert_max_queries(3) as stats:
+        response = client.put("/tasks/batch", json={"items": items[:2]}, headers=user_headers)
+    assert response.status_code == 200
+
+    # No more statements for 20 items than for 2
+    with assert_max_queries(stats.count):
+        response = client.put("/tasks/batch", json={"items": items}, headers=user_headers)
+    assert response.status_code == 200
+    assert {result["status"] for result in response.json()["results"]} == {"updated"}
+
+
+def test_batch_create_and_delete_budget(client, user_headers):
+    with assert_max_queries(1):
+        response = client.post(
+            "/tasks/batch",
+            json={"items": [{"title": f"budget {i}"} for i in range(20)]},
+            headers=user_headers,
+        )
+    assert response.status_code == 200
+    task_ids = [result["id"] for result in response.json()["results"]]
+
+    # Owner lookup over tasks and tasks_archive, then one DELETE per table
+    with assert_max_queries(3):
+        response = client.request("DELETE", "/tasks/batch", json={"ids": task_ids}, headers=user_headers)
+    assert response.status_code == 200
+    assert {result["status"] for result in response.json()["results"]} == {"deleted"}
@@ -0,0 +1,29 @@
+import pytest
+
+from app.core import rate_limit
+
+
+@pytest.fixture
+def login_limits(monkeypatch):
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_ENABLED", True)
+    # The route dependency holds on to this dict: swap its buckets in place
+    limiters = rate_limit._limiters["login"]
+    monkeypatch.setitem(limiters, "ip", rate_limit.TokenBucketLimiter(100, 60))
+    monkeypatch.setitem(limiters, "email", rate_limit.TokenBucketLimiter(3, 60))
+
+
+def test_successful_logins_do_not_spend_the_email_bucket(client, dataset, login_limits):
+    credentials = {"email": dataset["user_emails"][1], "password": dataset["password"]}
+    for _ in range(5):
+        assert client.post("/auth/login", json=credentials).status_code == 200
+
+
+def test_failed_logins_lock_the_email_out(client, dataset, login_limits):
+    email = dataset["user_emails"][2]
+    for _ in range(3):
+        response = client.post("/auth/login", json={"email": email, "password": "wrong"})
+        assert response.status_code == 401
+
+    response = client.post("/auth/login", json={"email": email, "password": dataset["password"]})
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
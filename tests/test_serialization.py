@@ -0,0 +1,46 @@
+import gc
+import weakref
+from itertools import combinations
+
+from app.core.serialization import (
+    ENCODER_CACHE_SIZE,
+    _projected_schema,
+    _row_encoder,
+    row_encoder,
+    sparse_schema,
+)
+from app.models import Task, User
+from app.schemas.task import TaskOut
+from app.schemas.user import UserOut
+
+
+def _every_fieldset(schema):
+    names = list(schema.model_fields)
+    for size in range(1, len(names)):
+        for subset in combinations(names, size):
+            yield ",".join(subset)
+
+
+def test_sparse_fieldsets_do_not_grow_memory_without_bound():
+    first = weakref.ref(sparse_schema(TaskOut, "id"))
+    row_encoder(Task, first())
+
+    # More distinct fieldsets than the caches hold
+    for _ in range(2):
+        for model, schema in ((Task, TaskOut), (User, UserOut)):
+            for fields in _every_fieldset(schema):
+                row_encoder(model, sparse_schema(schema, fields))
+
+    assert _projected_schema.cache_info().currsize <= ENCODER_CACHE_SIZE
+    assert _row_encoder.cache_info().currsize <= ENCODER_CACHE_SIZE
+    # An evicted schema class is not kept alive by the encoder cache
+    gc.collect()
+    assert first() is None
+
+
+def test_encoder_is_shared_by_equal_fieldsets():
+    schema = sparse_schema(TaskOut, "title,id")
+    _projected_schema.cache_clear()
+    assert row_encoder(Task, sparse_schema(TaskOut, "id,title")) is row_encoder(Task, schema)
+    # Columns come in schema field order
+    assert row_encoder(Task, schema)(("Title", "task-id")) == {"title": "Title", "id": "task-id"}
@@ -0,0 +1,18 @@
+import pytest
+from fastapi import HTTPException
+
+from app.core.sharding import ShardRouter
+
+
+def test_writes_are_fenced_while_an_owner_is_moving():
+    router = ShardRouter([], sharded=True)
+    router.set_placements({"moving-owner": "a"}, moving={"moving-owner"})
+
+    router.ensure_writable("other-owner")
+    with pytest.raises(HTTPException) as exc:
+        router.ensure_writable("other-owner", "moving-owner")
+    assert exc.value.status_code == 503
+    assert "Retry-After" in exc.value.headers
+
+    router.set_placements({"moving-owner": "a"})
+    router.ensure_writable("moving-owner")
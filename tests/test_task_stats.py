@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+
+from app.core.archive import archive_tasks
+from app.database import engine
+from app.models import Task, TaskArchive
+from tests.conftest import login
+
+
+def _stats(client, headers):
+    response = client.get("/tasks/stats", headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_archiving_keeps_task_counters(client, dataset):
+    headers = login(client, dataset["user_emails"][3], dataset["password"])
+    response = client.post("/tasks/", json={"title": "finished long ago"}, headers=headers)
+    task_id = response.json()["id"]
+    client.put(f"/tasks/{task_id}", json={"status": "done"}, headers=headers)
+    with engine.begin() as connection:
+        connection.execute(
+            update(Task).where(Task.id == task_id).values(updated_at=datetime.utcnow() - timedelta(days=365))
+        )
+    before = _stats(client, headers)
+
+    assert archive_tasks(engine, cutoff=datetime.utcnow() - timedelta(days=30)) >= 1
+    with engine.connect() as connection:
+        assert connection.execute(select(TaskArchive.id).where(TaskArchive.id == task_id)).first()
+    assert _stats(client, headers) == before
+
+    # Deleting the archived task takes it off the counters
+    assert client.delete(f"/tasks/{task_id}", headers=headers).status_code == 204
+    after = _stats(client, headers)
+    assert after["total"] == before["total"] - 1
+    assert after["by_status"].get("done", 0) == before["by_status"]["done"] - 1
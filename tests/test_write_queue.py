@@ -0,0 +1,29 @@
+import asyncio
+
+import pytest
+
+from app.core.write_queue import WriteQueue
+
+
+def test_stopping_the_writer_fails_writes_in_the_current_batch():
+    async def scenario():
+        queue = WriteQueue(window_ms=0)
+        started = asyncio.Event()
+
+        async def slow_write(session):
+            started.set()
+            await asyncio.sleep(3600)
+
+        writer = asyncio.create_task(queue.run())
+        await asyncio.sleep(0)
+        in_batch = asyncio.create_task(queue.submit(slow_write))
+        await started.wait()
+        queued = asyncio.create_task(queue.submit(slow_write))
+        await asyncio.sleep(0)
+
+        writer.cancel()
+        for caller in (in_batch, queued):
+            with pytest.raises(RuntimeError, match="Write queue stopped"):
+                await asyncio.wait_for(caller, timeout=5)
+
+    asyncio.run(scenario())